@@ -0,0 +1,29 @@
+"""Add jobs.heartbeat_at
+
+Revision ID: 5d2e8c41f0a7
+Revises: 97b04c33b8df
+Create Date: 2026-10-18 14:05:12.518903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8c41f0a7'
+down_revision = '97b04c33b8df'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created by the app's former create_all may already have it
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('jobs')}
+    if 'heartbeat_at' in columns:
+        return
+    # Nullable without a default: a metadata-only change, no table rewrite
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'heartbeat_at')
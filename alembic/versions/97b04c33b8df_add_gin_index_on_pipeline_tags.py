@@ -0,0 +1,42 @@
+"""Add GIN index on pipelines.tags
+
+Revision ID: 97b04c33b8df
+Revises: 47914f72a522
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '97b04c33b8df'
+down_revision = '47914f72a522'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Backs the "tags @> ARRAY[...]" filter of GET /api/v2/pipelines.
+    # Built concurrently so large tables stay writable during the migration.
+    # IF NOT EXISTS: databases created by the app's former create_all
+    # already have the index.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_pipelines_tags',
+            'pipelines',
+            ['tags'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_pipelines_tags',
+            table_name='pipelines',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,25 @@
+"""Add jobs.cancel_requested_at
+
+Revision ID: b81f3a9c2e64
+Revises: 5d2e8c41f0a7
+Create Date: 2026-10-18 17:48:03.227415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f3a9c2e64'
+down_revision = '5d2e8c41f0a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable without a default: a metadata-only change, no table rewrite
+    op.add_column('jobs', sa.Column('cancel_requested_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'cancel_requested_at')
@@ -1,77 +1,278 @@
-"""Redis cache utilities for user authentication"""
+"""
+Two-tier user cache for authentication
 
+Tier 1 is a small in-process LRU/TTL cache per worker, tier 2 is Redis.
+Invalidations are published on a Redis channel so every worker evicts its
+local copy; the short local TTL bounds staleness if a message is missed.
+
+Each worker holds a single pub/sub connection: other modules route their
+channels through it with add_channel_handler (e.g. live status events).
+"""
+
+import asyncio
 import json
-from typing import Optional
-from redis import Redis
+from typing import Callable, Optional
+from redis.asyncio import Redis, BlockingConnectionPool
 from redis.exceptions import RedisError
 from app.core.config import settings
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.local_cache import TTLCache
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Redis client (initialized lazily)
+# Published instead of a username to clear every worker's local tier
+_CLEAR_ALL_MESSAGE = "*"
+
+# Redis client (created in the application lifespan, see init_cache)
 _redis_client: Optional[Redis] = None
 
+# Background task serving every registered pub/sub channel
+_subscriber_task: Optional[asyncio.Task] = None
+
+# Message handlers by channel, all served by the one subscriber connection
+_channel_handlers: dict[str, Callable[[str], None]] = {}
+
+# True while subscribed, i.e. messages published now will reach this worker
+_subscribed = False
+
+# Circuit breaker so a Redis outage falls through to Postgres immediately
+_breaker = CircuitBreaker(
+    "redis_cache",
+    failure_threshold=settings.cache_breaker_failure_threshold,
+    backoff_base_seconds=settings.cache_breaker_backoff_base_seconds,
+    backoff_max_seconds=settings.cache_breaker_backoff_max_seconds
+)
+
+# In-process tier in front of Redis
+_local_cache = TTLCache(
+    "user_local",
+    maxsize=settings.local_cache_max_entries,
+    ttl_seconds=settings.local_cache_ttl_seconds
+)
+
+# Redis tier counters
+_redis_stats = {"hits": 0, "misses": 0, "errors": 0}
+
+
+async def init_cache() -> None:
+    """
+    Create the async Redis client backed by a bounded connection pool
+
+    Called once from the application lifespan. When Redis is unreachable at
+    startup the client is still kept, so the pool can reconnect once Redis
+    comes back; individual cache calls then fail soft.
+    """
+    global _redis_client, _subscriber_task
+
+    if not settings.cache_enabled:
+        logger.info("Redis cache disabled by configuration")
+        return
+
+    pool = BlockingConnectionPool.from_url(
+        settings.redis_url,
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout_seconds,
+        socket_connect_timeout=settings.redis_socket_timeout_seconds,
+        socket_timeout=settings.redis_socket_timeout_seconds
+    )
+    _redis_client = Redis.from_pool(pool)
+
+    try:
+        # Test connection
+        await _redis_client.ping()
+        _breaker.record_success()
+        logger.info("Redis cache connected successfully")
+    except RedisError as e:
+        # Skip Redis on the request path until the breaker's backoff elapses
+        _breaker.trip()
+        logger.warning(f"Redis connection failed: {e}. Cache calls will fail soft.")
+
+    _subscriber_task = asyncio.create_task(_listen_for_messages())
+
+
+async def close_cache() -> None:
+    """Stop the pub/sub subscriber and close the Redis client and pool"""
+    global _redis_client, _subscriber_task
+
+    if _subscriber_task is not None:
+        _subscriber_task.cancel()
+        try:
+            await _subscriber_task
+        except asyncio.CancelledError:
+            pass
+        _subscriber_task = None
+
+    _local_cache.clear()
+
+    if _redis_client is None:
+        return
+
+    try:
+        await _redis_client.aclose()
+    except RedisError as e:
+        logger.warning(f"Failed to close Redis client: {e}")
+    finally:
+        _redis_client = None
+
 
 def get_redis_client() -> Optional[Redis]:
     """
     Get Redis client instance
 
     Returns:
-        Redis client or None if cache is disabled or connection fails
+        Redis client or None if cache is disabled or not initialized
     """
-    global _redis_client
-
     if not settings.cache_enabled:
         return None
 
-    if _redis_client is None:
+    return _redis_client
+
+
+def _get_available_client() -> Optional[Redis]:
+    """
+    Get the Redis client if the circuit breaker allows a call right now
+
+    Callers report the outcome with record_success/record_failure and call
+    release_trial in a finally, so a half-open trial that ends in
+    cancellation or a non-Redis error (e.g. unserializable data) is given
+    back instead of blocking every later call.
+
+    Returns:
+        Redis client or None if cache is unavailable or the circuit is open
+    """
+    client = get_redis_client()
+    if not client or not _breaker.allow_request():
+        return None
+    return client
+
+
+def _apply_invalidation(message: str) -> None:
+    """Evict local entries named by an invalidation message"""
+    if message == _CLEAR_ALL_MESSAGE:
+        _local_cache.clear()
+    else:
+        _local_cache.delete(message)
+
+
+async def _publish_invalidation(client: Redis, message: str) -> None:
+    """Tell every worker to evict its local copy"""
+    await client.publish(settings.cache_invalidation_channel, message)
+
+
+def add_channel_handler(channel: str, handler: Callable[[str], None]) -> None:
+    """
+    Route the messages of a Redis channel to handler
+
+    Register at import time: the channels are subscribed when init_cache
+    starts the subscriber.
+
+    Args:
+        channel: Redis pub/sub channel name
+        handler: Called on the event loop with each message's data
+    """
+    _channel_handlers[channel] = handler
+
+
+def is_subscribed() -> bool:
+    """True while this worker receives the registered channels' messages"""
+    return _subscribed
+
+
+add_channel_handler(settings.cache_invalidation_channel, _apply_invalidation)
+
+
+async def _listen_for_messages() -> None:
+    """
+    Subscribe to every registered channel and dispatch its messages
+
+    Runs for the lifetime of the application and resubscribes with
+    exponential backoff whenever the Redis connection drops.
+    """
+    global _subscribed
+    backoff = settings.cache_breaker_backoff_base_seconds
+
+    while True:
+        client = get_redis_client()
+        if client is None:
+            return
+
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
         try:
-            _redis_client = Redis.from_url(
-                settings.redis_url,
-                decode_responses=True,
-                socket_connect_timeout=2,
-                socket_timeout=2
-            )
-            # Test connection
-            _redis_client.ping()
-            logger.info("Redis cache connected successfully")
+            await pubsub.subscribe(*_channel_handlers)
+            _subscribed = True
+            # Anything cached while we were not subscribed may be stale
+            _local_cache.clear()
+            backoff = settings.cache_breaker_backoff_base_seconds
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=1.0
+                )
+                if message is None:
+                    continue
+                try:
+                    _channel_handlers[message["channel"]](message["data"])
+                except Exception as e:
+                    # One bad message must not stop the other channels
+                    logger.warning(f"Failed to handle message on {message['channel']}: {e}")
         except RedisError as e:
-            logger.warning(f"Redis connection failed: {e}. Cache disabled.")
-            _redis_client = None
+            logger.warning(
+                f"Pub/sub subscriber lost Redis: {e}. "
+                f"Resubscribing in {backoff:.1f}s"
+            )
+        finally:
+            _subscribed = False
+            try:
+                await pubsub.aclose()
+            except RedisError:
+                pass
 
-    return _redis_client
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, settings.cache_breaker_backoff_max_seconds)
 
 
-def cache_user(username: str, user_data: dict) -> bool:
+async def cache_user(username: str, user_data: dict) -> bool:
     """
-    Cache user data in Redis
+    Cache user data in both tiers
 
     Args:
         username: Username to use as cache key
         user_data: User data dictionary to cache
 
     Returns:
-        True if cached successfully, False otherwise
+        True if cached in Redis successfully, False otherwise
     """
-    client = get_redis_client()
+    if not settings.cache_enabled:
+        return False
+
+    _local_cache.set(username, user_data)
+
+    client = _get_available_client()
     if not client:
         return False
 
     try:
         cache_key = f"user:{username}"
         user_json = json.dumps(user_data)
-        client.setex(cache_key, settings.cache_ttl_seconds, user_json)
+        await client.setex(cache_key, settings.cache_ttl_seconds, user_json)
+        _breaker.record_success()
         logger.debug(f"Cached user: {username}")
         return True
-    except (RedisError, json.JSONDecodeError) as e:
+    except RedisError as e:
+        _breaker.record_failure()
+        _redis_stats["errors"] += 1
         logger.warning(f"Failed to cache user {username}: {e}")
         return False
+    finally:
+        _breaker.release_trial()
 
 
-def get_cached_user(username: str) -> Optional[dict]:
+async def get_cached_user(username: str) -> Optional[dict]:
     """
-    Get cached user data from Redis
+    Get cached user data, checking the local tier before Redis
 
     Args:
         username: Username to look up
@@ -79,28 +280,47 @@ def get_cached_user(username: str) -> Optional[dict]:
     Returns:
         User data dictionary or None if not found/cache miss
     """
-    client = get_redis_client()
+    if not settings.cache_enabled:
+        return None
+
+    user_data = _local_cache.get(username)
+    if user_data is not None:
+        return user_data
+
+    client = _get_available_client()
     if not client:
         return None
 
     try:
         cache_key = f"user:{username}"
-        cached_data = client.get(cache_key)
+        cached_data = await client.get(cache_key)
+        _breaker.record_success()
 
         if cached_data:
+            _redis_stats["hits"] += 1
             logger.debug(f"Cache hit for user: {username}")
-            return json.loads(cached_data)
+            user_data = json.loads(cached_data)
+            _local_cache.set(username, user_data)
+            return user_data
 
+        _redis_stats["misses"] += 1
         logger.debug(f"Cache miss for user: {username}")
         return None
-    except (RedisError, json.JSONDecodeError) as e:
+    except RedisError as e:
+        _breaker.record_failure()
+        _redis_stats["errors"] += 1
         logger.warning(f"Failed to get cached user {username}: {e}")
         return None
+    except json.JSONDecodeError as e:
+        logger.warning(f"Failed to decode cached user {username}: {e}")
+        return None
+    finally:
+        _breaker.release_trial()
 
 
-def invalidate_user_cache(username: str) -> bool:
+async def invalidate_user_cache(username: str) -> bool:
     """
-    Invalidate (delete) cached user data
+    Invalidate (delete) cached user data in every worker
 
     Args:
         username: Username to invalidate
@@ -108,45 +328,77 @@ def invalidate_user_cache(username: str) -> bool:
     Returns:
         True if invalidated successfully, False otherwise
     """
-    client = get_redis_client()
+    _local_cache.delete(username)
+
+    client = _get_available_client()
     if not client:
         return False
 
     try:
         cache_key = f"user:{username}"
-        deleted = client.delete(cache_key)
+        deleted = await client.delete(cache_key)
+        await _publish_invalidation(client, username)
+        _breaker.record_success()
         if deleted:
             logger.debug(f"Invalidated cache for user: {username}")
         return bool(deleted)
     except RedisError as e:
+        _breaker.record_failure()
+        _redis_stats["errors"] += 1
         logger.warning(f"Failed to invalidate cache for {username}: {e}")
         return False
+    finally:
+        _breaker.release_trial()
 
 
-def clear_all_user_cache() -> bool:
+async def clear_all_user_cache() -> bool:
     """
-    Clear all user cache entries
+    Clear all user cache entries in every worker
 
     Returns:
         True if cleared successfully, False otherwise
     """
-    client = get_redis_client()
+    _local_cache.clear()
+
+    client = _get_available_client()
     if not client:
         return False
 
     try:
-        # Find all user cache keys
-        keys = client.keys("user:*")
+        # Find all user cache keys without blocking Redis on KEYS
+        keys = [key async for key in client.scan_iter(match="user:*", count=500)]
         if keys:
-            client.delete(*keys)
+            await client.delete(*keys)
             logger.info(f"Cleared {len(keys)} user cache entries")
+        await _publish_invalidation(client, _CLEAR_ALL_MESSAGE)
+        _breaker.record_success()
         return True
     except RedisError as e:
+        _breaker.record_failure()
+        _redis_stats["errors"] += 1
         logger.warning(f"Failed to clear user cache: {e}")
         return False
+    finally:
+        _breaker.release_trial()
 
 
-def get_cache_stats() -> dict:
+def _redis_tier_stats() -> dict:
+    lookups = _redis_stats["hits"] + _redis_stats["misses"]
+    return {
+        **_redis_stats,
+        "hit_ratio": round(_redis_stats["hits"] / lookups, 4) if lookups else 0.0
+    }
+
+
+def get_cache_tier_stats() -> dict:
+    """Counters of the local and Redis tiers, without a Redis round trip"""
+    return {
+        "local": _local_cache.stats(),
+        "redis": _redis_tier_stats()
+    }
+
+
+async def get_cache_stats() -> dict:
     """
     Get cache statistics
 
@@ -157,9 +409,22 @@ def get_cache_stats() -> dict:
     if not client:
         return {"enabled": False, "status": "disabled"}
 
+    tiers = get_cache_tier_stats()
+
+    if not _breaker.allow_request():
+        return {
+            "enabled": True,
+            "status": "circuit_open",
+            "tiers": tiers,
+            "circuit_breaker": _breaker.stats()
+        }
+
     try:
-        info = client.info()
-        user_keys = len(client.keys("user:*"))
+        info = await client.info()
+        user_keys = 0
+        async for _ in client.scan_iter(match="user:*", count=500):
+            user_keys += 1
+        _breaker.record_success()
 
         return {
             "enabled": True,
@@ -167,7 +432,18 @@ def get_cache_stats() -> dict:
             "total_keys": info.get("db0", {}).get("keys", 0),
             "user_cache_keys": user_keys,
             "memory_used": info.get("used_memory_human", "unknown"),
-            "connected_clients": info.get("connected_clients", 0)
+            "connected_clients": info.get("connected_clients", 0),
+            "pool_max_connections": settings.redis_max_connections,
+            "tiers": tiers,
+            "circuit_breaker": _breaker.stats()
         }
     except RedisError as e:
-        return {"enabled": True, "status": f"error: {e}"}
+        _breaker.record_failure()
+        return {
+            "enabled": True,
+            "status": f"error: {e}",
+            "tiers": tiers,
+            "circuit_breaker": _breaker.stats()
+        }
+    finally:
+        _breaker.release_trial()
@@ -0,0 +1,124 @@
+"""Circuit breaker for optional backends such as the Redis cache"""
+
+import time
+import logging
+from enum import Enum
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker with exponential backoff
+
+    - CLOSED: calls go through; consecutive failures are counted
+    - OPEN: calls are rejected immediately until the backoff elapses
+    - HALF_OPEN: a single trial call is let through; success closes the
+      circuit, failure re-opens it with a doubled backoff. A trial that
+      never reports back (e.g. its caller was cancelled) is abandoned after
+      trial_timeout_seconds so the circuit can't stay half-open forever
+
+    The breaker is only used from the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 60.0,
+        trial_timeout_seconds: float = 30.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.trial_timeout_seconds = trial_timeout_seconds
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0  # consecutive openings, drives the backoff
+        self.opened_at: float = 0.0
+        self.retry_at: float = 0.0
+        self.total_rejected = 0
+        self._trial_in_flight = False
+        self._trial_deadline: float = 0.0
+
+    def _backoff_seconds(self) -> float:
+        backoff = self.backoff_base_seconds * (2 ** max(self.open_count - 1, 0))
+        return min(backoff, self.backoff_max_seconds)
+
+    def allow_request(self) -> bool:
+        """Return True if a call to the backend may be attempted now"""
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() < self.retry_at:
+                self.total_rejected += 1
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+            logger.info(f"Circuit '{self.name}' half-open, probing backend")
+
+        # HALF_OPEN: let exactly one trial call through
+        now = time.monotonic()
+        if self._trial_in_flight and now < self._trial_deadline:
+            self.total_rejected += 1
+            return False
+        self._trial_in_flight = True
+        self._trial_deadline = now + self.trial_timeout_seconds
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful backend call"""
+        if self.state != CircuitState.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed, backend recovered")
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial that ended without touching the backend"""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed backend call and open the circuit if needed"""
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.trip()
+
+    def trip(self) -> None:
+        """Open the circuit immediately, e.g. when a startup probe fails"""
+        self.open_count += 1
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+        backoff = self._backoff_seconds()
+        self.retry_at = self.opened_at + backoff
+        logger.warning(
+            f"Circuit '{self.name}' opened, retrying in {backoff:.1f}s "
+            f"(consecutive failures: {self.consecutive_failures})"
+        )
+
+    def stats(self) -> dict:
+        """Current breaker state for monitoring"""
+        retry_in = max(self.retry_at - time.monotonic(), 0.0)
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "open_count": self.open_count,
+            "retry_in_seconds": round(retry_in, 3) if self.state == CircuitState.OPEN else 0.0,
+            "total_rejected": self.total_rejected
+        }
@@ -1,21 +1,167 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import declarative_base, Session
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.schema import check_schema_version
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.db_echo,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+logger = logging.getLogger(__name__)
+
+# Marks a client's reads as primary-only until the epoch time it holds
+READ_PRIMARY_COOKIE = "read_primary_until"
+READ_PRIMARY_HEADER = "x-read-primary-until"
+
+
+POOL_WAIT = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time to obtain a usable pooled connection (queue wait, connect, pre-ping)",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
 )
+POOL_TIMEOUTS = registry.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after db_pool_timeout_seconds", ("pool",)
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records checkout latency and timeouts
+
+    Args:
+        metrics_label: Value of the "pool" label on its metrics; passed
+            through create_async_engine like any other pool argument
+    """
+
+    def __init__(self, creator, metrics_label: str = "default", **kw):
+        super().__init__(creator, **kw)
+        self.metrics_label = metrics_label
+
+    def recreate(self) -> "TimedQueuePool":
+        # engine.dispose() swaps in a new pool built from the base arguments
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        labels = (self.metrics_label,)
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc(labels)
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - start, labels)
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def _connect_args(url: str) -> dict:
+    """
+    asyncpg prepared-statement settings
+
+    Each pooled connection keeps up to db_prepared_statement_cache_size
+    prepared statements, so hot queries skip the parse/plan round trip.
+    Behind pgbouncer in transaction mode consecutive transactions may land
+    on different server connections: a statement prepared in one is missing
+    (or its numbered name already taken) in the next. That mode disables
+    both caches and gives every statement a unique name.
+    """
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    if settings.db_pgbouncer_transaction_mode:
+        return {
+            "prepared_statement_cache_size": 0,
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return {"prepared_statement_cache_size": settings.db_prepared_statement_cache_size}
+
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        future=True,
+        query_cache_size=settings.db_query_cache_size,
+        connect_args=_connect_args(url),
+        poolclass=TimedQueuePool,
+        metrics_label=name,
+        pool_logging_name=name,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+
+
+# Create async engine (primary: all writes and default reads)
+engine = _create_engine(settings.database_url, "primary")
+
+
+
+class TrackedSession(Session):
+    """Session that records whether it issued any writes in its transaction"""
+
+
+@event.listens_for(TrackedSession, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state):
+    # Anything that is not a SELECT (ORM DML or raw text) counts as a write
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(TrackedSession, "after_flush")
+def _mark_flush_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(TrackedSession, "after_commit")
+def _record_committed_write(session):
+    # Endpoints commit explicitly, so this (not get_db) tells the request
+    # context that the client should read its own writes from the primary
+    if session.info.pop("has_writes", None):
+        ctx = request_db_context.get()
+        if ctx is not None:
+            ctx.committed_write = True
+
+
+@event.listens_for(TrackedSession, "after_rollback")
+def _reset_write_tracking(session):
+    session.info.pop("has_writes", None)
+
+
+def _has_writes(session: AsyncSession) -> bool:
+    """True if the session flushed/executed writes or has pending changes"""
+    return bool(
+        session.info.get("has_writes")
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=TrackedSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -25,12 +171,131 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+class _Replica:
+    """Read replica engine guarded by its own circuit breaker"""
+
+    def __init__(self, index: int, url: str):
+        self.engine = _create_engine(url, f"replica_{index}")
+        self.breaker = CircuitBreaker(
+            f"db_replica_{index}",
+            failure_threshold=settings.replica_failure_threshold,
+            backoff_base_seconds=settings.replica_backoff_base_seconds,
+            backoff_max_seconds=settings.replica_backoff_max_seconds
+        )
+
+
+replicas = [_Replica(i, url) for i, url in enumerate(settings.get_replica_urls())]
+_replica_cycle = itertools.cycle(replicas) if replicas else None
+
+
+def _pick_replica() -> Optional[_Replica]:
+    """Next replica round-robin, skipping those whose circuit is open"""
+    for _ in range(len(replicas)):
+        replica = next(_replica_cycle)
+        if replica.breaker.allow_request():
+            return replica
+    return None
+
+
+def _is_connection_error(exc: BaseException) -> bool:
+    if isinstance(exc, DBAPIError) and exc.connection_invalidated:
+        return True
+    return isinstance(exc, (OperationalError, InterfaceError, OSError))
+
+
+class RequestDbContext:
+    """Per-request routing state, set by RequestContextMiddleware"""
+
+    __slots__ = ("committed_write",)
+
+    def __init__(self):
+        self.committed_write = False
+
+
+request_db_context: ContextVar[Optional[RequestDbContext]] = ContextVar(
+    "request_db_context", default=None
+)
+
+
+def read_primary_until() -> float:
+    """Epoch time until which the current client should read from the primary"""
+    return time.time() + settings.read_your_writes_seconds
+
+
+@asynccontextmanager
+async def read_session(prefer_primary: bool = False) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only work, bound to a replica when one is available
+
+    Falls back to the primary when no replicas are configured, all of them
+    have an open circuit, or prefer_primary is set. Connection failures on
+    a replica count against its circuit breaker.
+    """
+    replica = None if prefer_primary or not replicas else _pick_replica()
+    bind = replica.engine if replica else engine
+
+    async with AsyncSessionLocal(bind=bind) as session:
+        failed = False
+        try:
+            yield session
+        except Exception as e:
+            if replica is not None and _is_connection_error(e):
+                failed = True
+                logger.warning(f"Read replica {replica.breaker.name} failed: {e}")
+                replica.breaker.record_failure()
+            raise
+        finally:
+            if replica is not None and not failed:
+                # A session that never checked out a connection proves nothing
+                if session.in_transaction():
+                    replica.breaker.record_success()
+                else:
+                    replica.breaker.release_trial()
+            # Never commits: anything written by mistake is rolled back
+            await session.close()
+
+
+def wants_primary(request: Request) -> bool:
+    """True inside a client's read-your-writes window"""
+    ctx = request_db_context.get()
+    if ctx is not None and ctx.committed_write:
+        return True
+    until = request.cookies.get(READ_PRIMARY_COOKIE) or request.headers.get(READ_PRIMARY_HEADER)
+    if not until:
+        return False
+    try:
+        return float(until) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request):
+    """
+    Dependency to get a read-only database session
+
+    Routed to a read replica (round-robin, skipping unhealthy ones) unless
+    the client wrote within read_your_writes_seconds, in which case it
+    reads from the primary so it sees its own changes.
+    """
+    async with read_session(prefer_primary=wants_primary(request)) as session:
+        yield session
+
+
 async def get_db():
-    """Dependency to get database session"""
+    """
+    Dependency to get database session
+
+    The session is lazy: a pooled connection is only checked out when the
+    first statement runs, so requests served entirely from cache (e.g. an
+    auth cache hit) never touch the pool. COMMIT is only sent when the
+    session actually wrote something; read-only transactions are simply
+    released on close.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session.in_transaction() and _has_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -38,12 +303,126 @@ async def get_db():
             await session.close()
 
 
+def get_pool_stats(async_engine: Optional[AsyncEngine] = None) -> dict:
+    """Connection pool occupancy of this worker (primary pool by default)"""
+    pool = (async_engine or engine).pool
+    if not isinstance(pool, QueuePool):
+        # NullPool/StaticPool (e.g. SQLite in tests) keep no occupancy counters
+        return {"size": 0, "checked_out": 0, "overflow": 0, "capacity": 0, "saturation": 0.0}
+    size = pool.size()
+    # Every engine is built from these settings (see _create_engine)
+    capacity = settings.db_pool_size + max(settings.db_max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": size,
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 4) if capacity else 0.0
+    }
+
+
+def get_all_pool_stats() -> dict:
+    """Occupancy of the primary and every replica pool"""
+    stats = {"primary": get_pool_stats()}
+    for index, replica in enumerate(replicas):
+        stats[f"replica_{index}"] = get_pool_stats(replica.engine)
+    return stats
+
+
+def _pool_series(attribute: str):
+    def collect() -> dict:
+        return {(name,): pool[attribute] for name, pool in get_all_pool_stats().items()}
+    return collect
+
+
+for _attribute, _doc in (
+    ("size", "Configured connection pool size"),
+    ("checked_out", "Connections currently checked out of the pool"),
+    ("overflow", "Connections open beyond the pool size"),
+    ("capacity", "Pool size plus max overflow"),
+):
+    registry.callback(f"db_pool_{_attribute}", _doc, "gauge", _pool_series(_attribute), ("pool",))
+
+
+async def _warm_up_engine(async_engine: AsyncEngine, connections: int) -> int:
+    """Open connections concurrently, then return them all to the pool"""
+    ready, opened = asyncio.Event(), []
+
+    async def hold() -> None:
+        try:
+            async with async_engine.connect() as conn:
+                await conn.exec_driver_sql("SELECT 1")
+                opened.append(conn)
+                # Keep it checked out until every connection is open, so each
+                # checkout creates a new one instead of reusing the first
+                if len(opened) >= connections:
+                    ready.set()
+                await ready.wait()
+        except Exception:
+            # Don't leave the other connections waiting for this one
+            ready.set()
+            raise
+
+    results = await asyncio.gather(*[hold() for _ in range(connections)], return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors:
+        logger.warning(f"Pool warm-up: {len(errors)} connections failed, e.g. {errors[0]}")
+    return len(opened)
+
+
+async def warm_up_pools() -> None:
+    """
+    Pre-open db_pool_warm_connections per pool (called from the lifespan)
+
+    The first burst after a deploy then finds ready connections instead of
+    paying TCP, TLS and auth on the request path.
+    """
+    connections = min(settings.db_pool_warm_connections, settings.db_pool_size)
+    if connections <= 0:
+        return
+    engines = {"primary": engine, **{f"replica_{i}": r.engine for i, r in enumerate(replicas)}}
+    for name, async_engine in engines.items():
+        start = time.perf_counter()
+        try:
+            opened = await asyncio.wait_for(
+                _warm_up_engine(async_engine, connections),
+                timeout=settings.db_pool_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            # Not fatal: remaining connections are opened on demand
+            logger.warning(f"Warming {name} pool timed out")
+            continue
+        logger.info(
+            f"Warmed {name} pool: {opened}/{connections} connections "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+
 async def init_db():
-    """Initialize database - create tables"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """
+    Check the database schema (called from the lifespan)
+
+    Migrations create and change tables; by default startup only verifies
+    the Alembic revision (see app.core.schema). With db_schema_mode set to
+    "create_all" missing tables are created from the models instead, for
+    throwaway databases such as SQLite in tests and benchmarks.
+
+    Raises:
+        SchemaVersionError: If the database is unmigrated or behind
+    """
+    if settings.db_schema_mode == "create_all":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        return
+
+    async with engine.connect() as conn:
+        revision = await check_schema_version(conn)
+    logger.info(f"Database schema at revision {revision}")
 
 
 async def close_db():
     """Close database connections"""
     await engine.dispose()
+    for replica in replicas:
+        await replica.engine.dispose()
@@ -0,0 +1,162 @@
+"""
+Live pipeline and job status events
+
+Events are published once to a Redis channel. Each API worker's shared
+pub/sub subscriber (see app.core.cache) relays them to the SSE and
+WebSocket clients connected to it. When Redis is disabled or the
+subscriber is disconnected, events are delivered to this worker's clients
+only.
+
+Each client has a bounded queue. When a slow client falls behind, its
+oldest events are dropped and it is told how many it missed, so one stuck
+connection can't grow memory without limit.
+"""
+
+import asyncio
+import logging
+import orjson
+from datetime import datetime, timezone
+from typing import Optional
+from redis.exceptions import RedisError
+from app.core.cache import add_channel_handler, get_redis_client, is_subscribed
+from app.core.config import settings
+from app.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class TooManySubscribersError(Exception):
+    """Raised when this worker already serves event_max_subscribers clients"""
+
+
+class EventSubscriber:
+    """
+    One connected client's bounded event queue
+
+    Args:
+        pipeline_id: Only receive events of this pipeline
+        job_id: Only receive events of this job
+    """
+
+    def __init__(self, pipeline_id: Optional[int] = None, job_id: Optional[int] = None):
+        self.pipeline_id = pipeline_id
+        self.job_id = job_id
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.event_subscriber_queue_size)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def wants(self, event: dict) -> bool:
+        if self.pipeline_id is not None and event.get("pipeline_id") != self.pipeline_id:
+            return False
+        if self.job_id is not None and event.get("job_id") != self.job_id:
+            return False
+        return True
+
+    def put(self, event_type: str, data: str) -> None:
+        """Queue an event, dropping the oldest one when the client lags"""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait((event_type, data))
+
+    async def get(self) -> tuple[str, str]:
+        """
+        Wait for the next event
+
+        Returns:
+            (event type, JSON data); a "lagged" event reporting the number
+            of dropped events comes first if the client fell behind
+        """
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return "lagged", dumps({"dropped": dropped}).decode()
+        return await self._queue.get()
+
+
+# Clients connected to this worker
+_subscribers: set[EventSubscriber] = set()
+
+_stats = {"published": 0, "delivered": 0, "publish_errors": 0}
+
+
+def has_capacity() -> bool:
+    """True if subscribe() would accept another client"""
+    return len(_subscribers) < settings.event_max_subscribers
+
+
+def subscribe(pipeline_id: Optional[int] = None, job_id: Optional[int] = None) -> EventSubscriber:
+    """
+    Register a client
+
+    Raises:
+        TooManySubscribersError: If this worker is at event_max_subscribers
+    """
+    if not has_capacity():
+        raise TooManySubscribersError("Too many event subscribers")
+    subscriber = EventSubscriber(pipeline_id=pipeline_id, job_id=job_id)
+    _subscribers.add(subscriber)
+    return subscriber
+
+
+def unsubscribe(subscriber: EventSubscriber) -> None:
+    """Remove a client"""
+    _subscribers.discard(subscriber)
+
+
+def _dispatch(message: str) -> None:
+    """Fan an encoded event out to the matching local clients"""
+    event = orjson.loads(message)
+    event_type = event.get("type", "message")
+    for subscriber in _subscribers:
+        if subscriber.wants(event):
+            subscriber.put(event_type, message)
+            _stats["delivered"] += 1
+
+
+add_channel_handler(settings.events_channel, _dispatch)
+
+
+async def publish_event(event: dict) -> None:
+    """
+    Publish an event to every worker's clients
+
+    Never raises; falls back to local delivery when Redis is unavailable.
+    """
+    event.setdefault("timestamp", datetime.now(timezone.utc))
+    message = dumps(event).decode()
+    _stats["published"] += 1
+
+    client = get_redis_client()
+    # Only go through Redis if the event will come back to our own clients
+    if client is not None and is_subscribed():
+        try:
+            await client.publish(settings.events_channel, message)
+            return
+        except RedisError as e:
+            _stats["publish_errors"] += 1
+            logger.warning(f"Event publish failed, delivering locally: {e}")
+
+    _dispatch(message)
+
+
+def pipeline_event(pipeline_id: int, status: str) -> dict:
+    """Build a pipeline status event"""
+    return {"type": "pipeline", "pipeline_id": pipeline_id, "status": status}
+
+
+def job_event(job_id: int, pipeline_id: int, **values) -> dict:
+    """Build a job event from the job columns that changed"""
+    return {"type": "job", "job_id": job_id, "pipeline_id": pipeline_id, **values}
+
+
+def get_event_stats() -> dict:
+    """Subscriber and delivery counters for monitoring"""
+    return {
+        **_stats,
+        "subscribers": len(_subscribers),
+        "redis_fanout": is_subscribed(),
+        "queued": sum(s.pending for s in _subscribers)
+    }
@@ -0,0 +1,137 @@
+"""
+Dependency health probes
+
+Postgres and Redis are probed concurrently, each under its own timeout.
+The combined result is cached for health_cache_ttl_seconds and concurrent
+callers share one in-flight probe, so frequent load balancer checks cost
+at most one SELECT 1 and one PING per TTL per worker.
+
+The Postgres probe goes through this worker's pool like any request. When
+it times out still waiting for a pooled connection while the pool is fully
+checked out, Postgres is reported "saturated" (the worker is busy, the
+database is not down) so load balancers don't pull every busy worker at
+once and push its traffic onto the others.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.core.database import engine, get_pool_stats
+
+
+async def _timed_probe(probe: Callable[[], Awaitable[None]], timeout: float) -> dict:
+    """Run a probe and report its status and latency"""
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(probe(), timeout=timeout)
+        result = {"status": "up", "error": None}
+    except asyncio.TimeoutError:
+        result = {"status": "down", "error": f"Timed out after {timeout}s"}
+    except (SQLAlchemyError, RedisError, OSError) as e:
+        result = {"status": "down", "error": str(e)[:200]}
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+async def _probe_postgres() -> dict:
+    checked_out = False
+
+    async def select_one() -> None:
+        nonlocal checked_out
+        async with engine.connect() as conn:
+            checked_out = True
+            await conn.execute(text("SELECT 1"))
+
+    result = await _timed_probe(select_one, settings.health_db_timeout_seconds)
+    pool = get_pool_stats()
+    if result["status"] == "down" and not checked_out and pool["capacity"] and (
+        pool["checked_out"] >= pool["capacity"]
+    ):
+        result["status"] = "saturated"
+        result["error"] = f"No pooled connection free ({pool['checked_out']}/{pool['capacity']} checked out)"
+    result["details"] = pool
+    return result
+
+
+async def _probe_redis() -> dict:
+    client = get_redis_client()
+    if client is None:
+        return {"status": "disabled", "error": None, "latency_ms": None, "details": {}}
+
+    result = await _timed_probe(client.ping, settings.health_redis_timeout_seconds)
+    pool = client.connection_pool
+    in_use = len(getattr(pool, "_in_use_connections", ()))
+    result["details"] = {
+        "in_use": in_use,
+        "max_connections": pool.max_connections,
+        "saturation": round(in_use / pool.max_connections, 4) if pool.max_connections else 0.0
+    }
+    return result
+
+
+def _overall_status(dependencies: dict) -> str:
+    """
+    Postgres down -> unhealthy (stop routing traffic here)
+    Postgres saturated -> degraded (reachable, this worker's pool is busy)
+    Redis down -> degraded (the cache fails soft to Postgres)
+    """
+    postgres = dependencies["postgres"]["status"]
+    if postgres not in ("up", "saturated"):
+        return "unhealthy"
+    if postgres == "saturated" or dependencies["redis"]["status"] == "down":
+        return "degraded"
+    return "healthy"
+
+
+async def _run_probes() -> dict:
+    postgres, redis = await asyncio.gather(_probe_postgres(), _probe_redis())
+    dependencies = {"postgres": postgres, "redis": redis}
+    return {
+        "status": _overall_status(dependencies),
+        "checked_at": datetime.now(timezone.utc),
+        "dependencies": dependencies
+    }
+
+
+class HealthChecker:
+    """Caches the latest probe result and coalesces concurrent checks"""
+
+    def __init__(self):
+        self._result: Optional[dict] = None
+        self._expires_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def check(self) -> tuple[dict, bool]:
+        """
+        Get the dependency health
+
+        Returns:
+            (result, cached) where cached is True if no probe ran for this call
+        """
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result, True
+
+        if self._inflight is None:
+            self._inflight = asyncio.create_task(_run_probes())
+            self._inflight.add_done_callback(self._store)
+            cached = False
+        else:
+            cached = True
+        # Shield so a disconnecting client doesn't cancel everyone's probe
+        return await asyncio.shield(self._inflight), cached
+
+    def _store(self, task: asyncio.Task) -> None:
+        self._inflight = None
+        if not task.cancelled() and task.exception() is None:
+            self._result = task.result()
+            self._expires_at = time.monotonic() + settings.health_cache_ttl_seconds
+
+
+# Per-worker health checker used by the monitoring endpoints
+health_checker = HealthChecker()
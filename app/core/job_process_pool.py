@@ -0,0 +1,178 @@
+"""
+Executor for CPU-bound pipeline steps
+
+In "process" mode steps run on a warmed ProcessPoolExecutor, so CPU-heavy
+transforms use more than the one core the GIL allows per API worker. In
+"thread" mode (the default) they run on the default thread pool, which
+keeps them off the event loop but not off the GIL.
+
+Progress flows back from the worker processes through a Manager dict that
+the parent polls while waiting for the step's result. Every access to that
+proxy is a round trip to the manager process, so the parent makes it from
+a thread rather than on the event loop.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Progress by job id. Plain dict in the parent (thread mode); replaced by a
+# Manager dict proxy in worker processes through the pool initializer.
+_progress: dict = {}
+
+
+class WorkerCrashedError(Exception):
+    """Raised when a worker process died while running a step"""
+
+
+@dataclass(frozen=True)
+class CpuStepContext:
+    """Picklable context handed to a CPU-bound step"""
+    job_id: int
+    pipeline_id: int
+    pipeline_name: str
+
+    def report_progress(self, records_processed: int) -> None:
+        """Publish progress to the parent process"""
+        _progress[self.job_id] = records_processed
+
+
+# A CPU step is a module-level (picklable) function returning records processed
+CpuStep = Callable[[CpuStepContext], int]
+
+
+def _init_worker(progress) -> None:
+    global _progress
+    _progress = progress
+
+
+def _warm_up(delay: float) -> int:
+    # Holding each task briefly forces the pool to start every process
+    time.sleep(delay)
+    return multiprocessing.current_process().pid
+
+
+class JobProcessPool:
+    """Runs CPU steps on threads or on a pool of worker processes"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self.restarts = 0
+
+    @property
+    def mode(self) -> str:
+        return settings.job_cpu_executor
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=settings.job_process_pool_size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._progress,)
+        )
+
+    async def start(self) -> None:
+        """Create and warm the process pool when running in process mode"""
+        if self.mode != "process" or self._executor is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._manager = await loop.run_in_executor(None, multiprocessing.get_context("spawn").Manager)
+        self._progress = self._manager.dict()
+        self._executor = self._create_executor()
+
+        start = time.perf_counter()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _warm_up, 0.2)
+            for _ in range(settings.job_process_pool_size)
+        ])
+        logger.info(
+            f"Job process pool warmed: {len(set(pids))} processes "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+
+    async def stop(self) -> None:
+        """Shut down the pool and the progress manager"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+            self._progress = None
+
+    def _restart(self) -> None:
+        """Replace a broken pool (a worker process died)"""
+        logger.warning("Job process pool broken, restarting it")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_executor()
+        self.restarts += 1
+
+    async def run(self, step: CpuStep, step_ctx: CpuStepContext, on_progress) -> int:
+        """
+        Run a CPU step and relay its progress
+
+        Args:
+            step: Module-level function taking a CpuStepContext
+            step_ctx: Context passed to the step
+            on_progress: Coroutine function called with records processed
+
+        Raises:
+            WorkerCrashedError: If the worker process died during the step
+        """
+        loop = asyncio.get_running_loop()
+        use_processes = self.mode == "process" and self._executor is not None
+        progress = self._progress if use_processes else _progress
+
+        async def access_progress(method, *args):
+            # Manager proxy calls are blocking IPC; the local dict is not
+            if use_processes:
+                return await asyncio.to_thread(method, *args)
+            return method(*args)
+
+        executor = self._executor
+        if use_processes:
+            future = loop.run_in_executor(executor, step, step_ctx)
+        else:
+            future = asyncio.ensure_future(asyncio.to_thread(step, step_ctx))
+
+        try:
+            while True:
+                done, _ = await asyncio.wait({future}, timeout=settings.job_progress_flush_seconds)
+                records = await access_progress(progress.get, step_ctx.job_id)
+                if records is not None:
+                    await on_progress(records)
+                if done:
+                    return future.result()
+        except asyncio.CancelledError:
+            # Drops the step if it has not started; a running step finishes
+            # in its worker and the result is discarded
+            future.cancel()
+            raise
+        except BrokenProcessPool as e:
+            if self._executor is executor:
+                self._restart()
+            raise WorkerCrashedError("Worker process crashed while running the job") from e
+        finally:
+            await access_progress(progress.pop, step_ctx.job_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "pool_size": settings.job_process_pool_size if self._executor else 0,
+            "restarts": self.restarts
+        }
+
+
+# Application-wide CPU executor, started and stopped with the job runner
+job_process_pool = JobProcessPool()
@@ -0,0 +1,523 @@
+"""
+In-process asynchronous job runner
+
+Jobs are persisted in the ``jobs`` table by the API and handed to a bounded
+asyncio queue drained by N worker tasks. Every state transition is written
+back to the table. A job is owned by the worker process that accepted it;
+claiming is a conditional UPDATE, so a job cancelled while still queued
+is never started - and a pending job queued by two workers runs once.
+
+Work left behind by a crashed worker is recovered by the others: running
+jobs refresh ``heartbeat_at`` every job_heartbeat_seconds, and each runner
+periodically fails running jobs whose heartbeat is older than
+job_stale_after_seconds and re-queues pending jobs that old (all pending
+jobs at startup).
+
+Any API worker can cancel a running job: it sets ``cancel_requested_at``
+on the row and publishes the job id on job_cancel_channel. The owner
+cancels the job as soon as the message arrives, or at its next heartbeat
+if Redis is unavailable.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import update, select, func
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.cache import add_channel_handler, get_redis_client
+from app.core.config import settings
+from app.core.events import publish_event, job_event
+from app.core.database import AsyncSessionLocal
+from app.core.job_process_pool import job_process_pool, CpuStep, CpuStepContext
+from app.models.db_models import Job, Pipeline
+from app.models.schemas import JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue has no room for another job"""
+
+
+@dataclass
+class JobContext:
+    """State handed to a job handler"""
+    job_id: int
+    pipeline_id: int
+    pipeline_name: str
+    records_processed: int = 0
+    _last_flush: float = field(default=0.0, repr=False)
+
+    async def report_progress(self, records_processed: int) -> None:
+        """
+        Record progress; persisted at most every job_progress_flush_seconds
+
+        Args:
+            records_processed: Total records processed so far by this job
+        """
+        self.records_processed = records_processed
+        now = time.monotonic()
+        if now - self._last_flush >= settings.job_progress_flush_seconds:
+            self._last_flush = now
+            await _update_job(self.job_id, self.pipeline_id, records_processed=records_processed)
+
+    async def run_cpu(self, step: CpuStep) -> int:
+        """
+        Run a CPU-bound step on the job executor (threads or processes)
+
+        Args:
+            step: Module-level function taking a CpuStepContext
+
+        Returns:
+            Records processed by the step
+        """
+        step_ctx = CpuStepContext(
+            job_id=self.job_id,
+            pipeline_id=self.pipeline_id,
+            pipeline_name=self.pipeline_name
+        )
+        base = self.records_processed
+
+        async def relay(records: int) -> None:
+            await self.report_progress(base + records)
+
+        return await job_process_pool.run(step, step_ctx, relay)
+
+
+# A pipeline step processes data and returns the number of records it handled
+PipelineStep = Callable[[JobContext], Awaitable[int]]
+JobHandler = Callable[[JobContext], Awaitable[int]]
+
+# Steps registered per pipeline name, run in order by execute_pipeline
+_pipeline_steps: dict[str, list[PipelineStep]] = defaultdict(list)
+
+
+def register_pipeline_step(pipeline_name: str, step: PipelineStep) -> None:
+    """Append a step to the named pipeline"""
+    _pipeline_steps[pipeline_name].append(step)
+
+
+def register_cpu_step(pipeline_name: str, step: CpuStep) -> None:
+    """
+    Append a CPU-bound step to the named pipeline
+
+    The step runs on the job executor (see settings.job_cpu_executor) and
+    must be a module-level function so it can be sent to worker processes.
+    """
+    async def run_step(ctx: JobContext) -> int:
+        return await ctx.run_cpu(step)
+
+    _pipeline_steps[pipeline_name].append(run_step)
+
+
+async def execute_pipeline(ctx: JobContext) -> int:
+    """
+    Default job handler - run the registered steps of the job's pipeline
+
+    Returns:
+        Total number of records processed
+    """
+    total = 0
+    for step in _pipeline_steps.get(ctx.pipeline_name, []):
+        total += await step(ctx)
+        await ctx.report_progress(total)
+    return total
+
+
+# Job columns included in status events
+_EVENT_FIELDS = ("status", "records_processed", "error_message")
+
+
+async def _update_job(job_id: int, pipeline_id: int, **values) -> None:
+    """Persist job column values in a short transaction and publish them"""
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Job).where(Job.id == job_id).values(**values))
+        await session.commit()
+    await publish_event(job_event(
+        job_id, pipeline_id, **{k: v for k, v in values.items() if k in _EVENT_FIELDS}
+    ))
+
+
+async def _fail_jobs(job_ids: list[int], error_message: str, statuses: tuple[str, ...]) -> None:
+    """Best-effort: mark jobs failed if they are still in one of the given statuses"""
+    if not job_ids:
+        return
+    try:
+        async with AsyncSessionLocal() as session:
+            failed = (await session.execute(
+                update(Job)
+                .where(Job.id.in_(job_ids), Job.status.in_(statuses))
+                .values(status=JobStatus.FAILED.value, completed_at=func.now(), error_message=error_message)
+                .returning(Job.id, Job.pipeline_id)
+            )).all()
+            await session.commit()
+    except (SQLAlchemyError, OSError) as e:
+        logger.warning(f"Could not mark {len(job_ids)} jobs failed, leaving them to recovery: {e}")
+        return
+    for job_id, pipeline_id in failed:
+        await publish_event(job_event(
+            job_id, pipeline_id, status=JobStatus.FAILED.value, error_message=error_message
+        ))
+
+
+@dataclass
+class _QueuedJob:
+    job_id: int
+    pipeline_id: int
+
+
+class JobRunner:
+    """
+    Bounded queue of jobs drained by a fixed number of asyncio workers
+
+    - At most job_queue_size jobs wait (queued or parked) at any time
+    - At most job_per_pipeline_concurrency jobs of one pipeline run at
+      once; extra jobs are parked and picked up when a slot frees, so
+      they do not block workers
+    - Running jobs can be cancelled; queued jobs are cancelled in the
+      database and skipped when dequeued
+    """
+
+    def __init__(self, handler: JobHandler = execute_pipeline):
+        self.handler = handler
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._running: dict[int, asyncio.Task] = {}
+        self._running_per_pipeline: dict[int, int] = defaultdict(int)
+        self._parked: dict[int, deque] = defaultdict(deque)
+        self._parked_count = 0
+        # Ids waiting in the queue or parked, so recovery doesn't queue them twice
+        self._queued_ids: set[int] = set()
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def started(self) -> bool:
+        return self._queue is not None
+
+    async def start(self) -> None:
+        """Start the worker tasks (called from the application lifespan)"""
+        if self.started:
+            return
+        self._stopping = False
+        await job_process_pool.start()
+        self._queue = asyncio.Queue(maxsize=settings.job_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(settings.job_workers)
+        ]
+        # Pick up pending jobs of workers that exited before running them
+        await self._recover(pending_min_age=0.0)
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop(), name="job-maintenance")
+        logger.info(f"Job runner started with {settings.job_workers} workers")
+
+    async def stop(self) -> None:
+        """Stop the workers; running and still-queued jobs are marked failed"""
+        if not self.started:
+            return
+        self._stopping = True
+        self._maintenance_task.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(self._maintenance_task, *self._workers, return_exceptions=True)
+        self._maintenance_task = None
+        self._workers = []
+
+        waiting = []
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for parked in self._parked.values():
+            waiting.extend(parked)
+        self._parked.clear()
+        self._parked_count = 0
+        self._queued_ids.clear()
+        self._queue = None
+        await _fail_jobs(
+            [item.job_id for item in waiting],
+            "Interrupted by shutdown before it started",
+            statuses=(JobStatus.PENDING.value,)
+        )
+
+        await job_process_pool.stop()
+        logger.info("Job runner stopped")
+
+    def is_full(self) -> bool:
+        """True if submit() would be rejected"""
+        if not self.started:
+            return True
+        return self._queue.qsize() + self._parked_count >= settings.job_queue_size
+
+    def free_slots(self) -> int:
+        """Number of jobs submit() would currently accept"""
+        if not self.started:
+            return 0
+        return max(settings.job_queue_size - self._queue.qsize() - self._parked_count, 0)
+
+    def submit(self, job_id: int, pipeline_id: int) -> None:
+        """
+        Enqueue a persisted pending job
+
+        Raises:
+            JobQueueFullError: If the queue is full or the runner is stopped
+        """
+        if self.is_full():
+            raise JobQueueFullError("Job queue is full")
+        self._queue.put_nowait(_QueuedJob(job_id=job_id, pipeline_id=pipeline_id))
+        self._queued_ids.add(job_id)
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job running in this process
+
+        Returns:
+            True if a running job was cancelled
+        """
+        task = self._running.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def request_cancel(self, job_id: int) -> None:
+        """
+        Cancel a running job wherever it runs
+
+        The caller has already set the job's cancel_requested_at, so the
+        owning runner cancels it at its next heartbeat even when Redis is
+        unavailable; the published message only makes that immediate.
+        """
+        if self.cancel(job_id):
+            return
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            await client.publish(settings.job_cancel_channel, str(job_id))
+        except RedisError as e:
+            logger.warning(f"Failed to publish cancellation of job {job_id}, left to its heartbeat: {e}")
+
+    def stats(self) -> dict:
+        """Queue and worker utilization for monitoring"""
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize() if self.started else 0,
+            "parked": self._parked_count,
+            "running": len(self._running),
+            "capacity": settings.job_queue_size,
+            "per_pipeline_limit": settings.job_per_pipeline_concurrency,
+            "cpu_executor": job_process_pool.stats()
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                if (
+                    self._running_per_pipeline.get(item.pipeline_id, 0)
+                    >= settings.job_per_pipeline_concurrency
+                ):
+                    self._parked[item.pipeline_id].append(item)
+                    self._parked_count += 1
+                    continue
+
+                await self._run_safely(item)
+                # Drain jobs of this pipeline that waited for the slot we held
+                parked = self._parked.get(item.pipeline_id)
+                while parked:
+                    next_item = parked.popleft()
+                    self._parked_count -= 1
+                    await self._run_safely(next_item)
+            finally:
+                self._queue.task_done()
+
+    async def _run_safely(self, item: _QueuedJob) -> None:
+        """Run a job; runner errors (e.g. the database is down) never kill the worker"""
+        self._queued_ids.discard(item.job_id)
+        try:
+            await self._run(item)
+        except Exception as e:
+            logger.exception(f"Job runner error on job {item.job_id}")
+            # If this fails too the job is left to the stale-job recovery
+            await _fail_jobs(
+                [item.job_id], f"Job runner error: {e}"[:1000],
+                statuses=(JobStatus.PENDING.value, JobStatus.RUNNING.value)
+            )
+
+    async def _claim(self, job_id: int) -> Optional[str]:
+        """Atomically move a pending job to running; returns its pipeline name"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == JobStatus.PENDING.value)
+                .values(status=JobStatus.RUNNING.value, started_at=func.now(), heartbeat_at=func.now())
+                .returning(Job.pipeline_id)
+            )
+            pipeline_id = result.scalar_one_or_none()
+            if pipeline_id is None:
+                await session.rollback()
+                return None
+            name = (await session.execute(
+                select(Pipeline.name).where(Pipeline.id == pipeline_id)
+            )).scalar_one_or_none()
+            await session.commit()
+        await publish_event(job_event(job_id, pipeline_id, status=JobStatus.RUNNING.value))
+        return name or ""
+
+    async def _run(self, item: _QueuedJob) -> None:
+        # Take the pipeline slot before the first await so the check in
+        # _worker and this increment can't interleave with another worker
+        self._running_per_pipeline[item.pipeline_id] += 1
+        try:
+            await self._claim_and_execute(item)
+        finally:
+            self._running_per_pipeline[item.pipeline_id] -= 1
+            if not self._running_per_pipeline[item.pipeline_id]:
+                del self._running_per_pipeline[item.pipeline_id]
+
+    async def _claim_and_execute(self, item: _QueuedJob) -> None:
+        pipeline_name = await self._claim(item.job_id)
+        if pipeline_name is None:
+            logger.debug(f"Job {item.job_id} no longer pending, skipped")
+            return
+
+        ctx = JobContext(job_id=item.job_id, pipeline_id=item.pipeline_id, pipeline_name=pipeline_name)
+        task = asyncio.create_task(self.handler(ctx), name=f"job-{item.job_id}")
+        self._running[item.job_id] = task
+
+        try:
+            records = await task
+        except asyncio.CancelledError:
+            if self._stopping:
+                await _update_job(
+                    item.job_id,
+                    item.pipeline_id,
+                    status=JobStatus.FAILED.value,
+                    completed_at=func.now(),
+                    records_processed=ctx.records_processed,
+                    error_message="Interrupted by shutdown"
+                )
+                raise
+            await _update_job(
+                item.job_id,
+                item.pipeline_id,
+                status=JobStatus.CANCELLED.value,
+                completed_at=func.now(),
+                records_processed=ctx.records_processed
+            )
+        except Exception as e:
+            logger.exception(f"Job {item.job_id} failed")
+            await _update_job(
+                item.job_id,
+                item.pipeline_id,
+                status=JobStatus.FAILED.value,
+                completed_at=func.now(),
+                records_processed=ctx.records_processed,
+                error_message=str(e)[:1000]
+            )
+        else:
+            await _update_job(
+                item.job_id,
+                item.pipeline_id,
+                status=JobStatus.COMPLETED.value,
+                completed_at=func.now(),
+                records_processed=records
+            )
+        finally:
+            self._running.pop(item.job_id, None)
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.job_heartbeat_seconds)
+            try:
+                await self._heartbeat()
+                await self._recover(pending_min_age=settings.job_stale_after_seconds)
+            except (SQLAlchemyError, OSError) as e:
+                logger.warning(f"Job heartbeat/recovery failed, retrying next cycle: {e}")
+
+    async def _heartbeat(self) -> None:
+        """Mark this runner's jobs as alive and cancel those flagged for it"""
+        if not self._running:
+            return
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(
+                update(Job)
+                .where(Job.id.in_(list(self._running)), Job.status == JobStatus.RUNNING.value)
+                .values(heartbeat_at=func.now())
+                .returning(Job.id, Job.cancel_requested_at)
+            )).all()
+            await session.commit()
+        for job_id, cancel_requested_at in rows:
+            if cancel_requested_at is not None:
+                self.cancel(job_id)
+
+    async def _recover(self, pending_min_age: float) -> None:
+        """
+        Fail running jobs whose worker stopped heartbeating and queue
+        pending jobs at least pending_min_age seconds old
+
+        Queuing a pending job another live worker also holds is harmless:
+        only one of them can claim it.
+        """
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=settings.job_stale_after_seconds)
+        lost_criteria = [
+            Job.status == JobStatus.RUNNING.value,
+            func.coalesce(Job.heartbeat_at, Job.started_at) < stale_before
+        ]
+        if self._running:
+            lost_criteria.append(Job.id.notin_(list(self._running)))
+
+        try:
+            async with AsyncSessionLocal() as session:
+                lost = (await session.execute(
+                    update(Job)
+                    .where(*lost_criteria)
+                    .values(
+                        status=JobStatus.FAILED.value,
+                        completed_at=func.now(),
+                        error_message="Worker lost while running"
+                    )
+                    .returning(Job.id, Job.pipeline_id)
+                )).all()
+                pending_query = select(Job.id, Job.pipeline_id).where(Job.status == JobStatus.PENDING.value)
+                if pending_min_age > 0:
+                    pending_query = pending_query.where(
+                        Job.created_at < now - timedelta(seconds=pending_min_age)
+                    )
+                pending = (await session.execute(
+                    pending_query.order_by(Job.id).limit(self.free_slots() + len(self._queued_ids))
+                )).all()
+                await session.commit()
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning(f"Job recovery failed: {e}")
+            return
+
+        for job_id, pipeline_id in lost:
+            await publish_event(job_event(
+                job_id, pipeline_id, status=JobStatus.FAILED.value, error_message="Worker lost while running"
+            ))
+        requeued = 0
+        for job_id, pipeline_id in pending:
+            if job_id in self._queued_ids or self.is_full():
+                continue
+            self.submit(job_id, pipeline_id)
+            requeued += 1
+        if lost or requeued:
+            logger.warning(f"Recovered jobs: {len(lost)} lost running jobs failed, {requeued} pending re-queued")
+
+
+# Application-wide runner, started and stopped in the lifespan
+job_runner = JobRunner()
+
+
+def _handle_cancel_message(message: str) -> None:
+    # Every worker gets the message; only the owner has the job running
+    job_runner.cancel(int(message))
+
+
+add_channel_handler(settings.job_cancel_channel, _handle_cancel_message)
@@ -0,0 +1,401 @@
+"""
+Prometheus metrics registry
+
+Metrics are plain dicts of floats updated from the event loop. Every
+recording happens on the loop thread of its worker, so the hot path takes
+no locks: an observation is a bisect and two dict updates.
+
+With several uvicorn workers, each worker periodically writes a JSON
+snapshot of its metrics to settings.metrics_multiproc_dir. A scrape merges
+the snapshots of all workers: counters and histograms are summed across
+live and exited workers, gauges across live workers only. The directory
+must be emptied whenever the server as a whole (re)starts.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+from app.core.cache import get_cache_tier_stats
+from app.core.config import settings
+from app.core.security import get_token_cache_stats
+
+logger = logging.getLogger(__name__)
+
+LabelValues = tuple
+
+# Request latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def series(self) -> dict:
+        """Current values by label values"""
+        raise NotImplementedError
+
+    def snapshot(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "series": [[list(labels), value] for labels, value in self.series().items()]
+        }
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = defaultdict(float)
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self._values[labels] += amount
+
+    def series(self) -> dict:
+        return dict(self._values)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = defaultdict(float)
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self._values[labels] += amount
+
+    def dec(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        self._values[labels] -= amount
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        self._values[labels] = value
+
+    def series(self) -> dict:
+        return dict(self._values)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values
+
+    A series is stored as per-bucket (non-cumulative) counts with the +Inf
+    bucket last, followed by the sum of observations.
+    """
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def series(self) -> dict:
+        return {labels: list(values) for labels, values in self._series.items()}
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class CallbackMetric(_Metric):
+    """Counter or gauge read from other components when collected"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        callback: Callable[[], dict],
+        labelnames: Iterable[str] = ()
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.type = metric_type
+        self._callback = callback
+
+    def series(self) -> dict:
+        try:
+            return self._callback()
+        except Exception as e:
+            logger.warning(f"Metric {self.name} collection failed: {e}")
+            return {}
+
+
+class MetricsRegistry:
+    """Named metrics of this worker"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        metric_type: str,
+        callback: Callable[[], dict],
+        labelnames: Iterable[str] = ()
+    ) -> CallbackMetric:
+        return self.register(CallbackMetric(name, documentation, metric_type, callback, labelnames))
+
+    def snapshot(self) -> dict:
+        """JSON-serializable values of every metric"""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+registry = MetricsRegistry()
+
+
+# ===== Multi-worker aggregation =====
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(settings.metrics_multiproc_dir, f"{pid}.json")
+
+
+def _write_snapshot(snapshot: dict) -> None:
+    path = _snapshot_path(os.getpid())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    # Atomic replace so a concurrent scrape never reads a partial file
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_worker_snapshots() -> list[tuple[dict, bool]]:
+    """Snapshots of the other workers, each with whether its process is alive"""
+    snapshots = []
+    own_pid = os.getpid()
+    for filename in os.listdir(settings.metrics_multiproc_dir):
+        pid_text, ext = os.path.splitext(filename)
+        if ext != ".json" or not pid_text.isdigit() or int(pid_text) == own_pid:
+            continue
+        try:
+            with open(os.path.join(settings.metrics_multiproc_dir, filename)) as f:
+                snapshots.append((json.load(f), _pid_alive(int(pid_text))))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable metrics snapshot {filename}: {e}")
+    return snapshots
+
+
+def _merge(snapshots: list[tuple[dict, bool]]) -> dict:
+    """Sum worker snapshots; gauges of exited workers are dropped"""
+    merged: dict[str, dict] = {}
+    for snapshot, alive in snapshots:
+        for name, metric in snapshot.items():
+            if metric["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, "series": {}})
+            series = target["series"]
+            for labels, value in metric["series"]:
+                key = tuple(labels)
+                current = series.get(key)
+                if current is None:
+                    series[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    series[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    series[key] = current + value
+    return merged
+
+
+# ===== Exposition =====
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labelnames, labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _add_ratios(merged: dict) -> None:
+    """Derive ratio gauges from the summed counters and gauges"""
+    hits = merged.get("cache_hits_total", {}).get("series", {})
+    misses = merged.get("cache_misses_total", {}).get("series", {})
+    if hits or misses:
+        merged["cache_hit_ratio"] = {
+            "type": "gauge",
+            "help": "Share of cache lookups that were hits",
+            "labelnames": ["cache"],
+            "series": {
+                key: (hits.get(key, 0) / total if (total := hits.get(key, 0) + misses.get(key, 0)) else 0.0)
+                for key in set(hits) | set(misses)
+            }
+        }
+
+    checked_out = merged.get("db_pool_checked_out", {}).get("series", {})
+    capacity = merged.get("db_pool_capacity", {}).get("series", {})
+    if checked_out:
+        merged["db_pool_utilization"] = {
+            "type": "gauge",
+            "help": "Checked-out connections as a share of pool size plus overflow",
+            "labelnames": ["pool"],
+            "series": {
+                key: (value / capacity[key] if capacity.get(key) else 0.0)
+                for key, value in checked_out.items()
+            }
+        }
+
+
+def _render(merged: dict) -> str:
+    lines = []
+    for name, metric in sorted(merged.items()):
+        labelnames = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["series"].items()):
+            if metric["type"] == "histogram":
+                cumulative = 0
+                bounds = [*metric["buckets"], float("inf")]
+                for bound, count in zip(bounds, value[:-1]):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{name}_bucket{_format_labels(labelnames, labels, le)} {cumulative}")
+                label_text = _format_labels(labelnames, labels)
+                lines.append(f"{name}_sum{label_text} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{label_text} {cumulative}")
+            else:
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+async def render_metrics() -> str:
+    """Text exposition of this worker's metrics, merged with the other workers'"""
+    own = (registry.snapshot(), True)
+    if settings.metrics_multiproc_dir:
+        others = await asyncio.to_thread(_read_worker_snapshots)
+    else:
+        others = []
+    merged = _merge([own, *others])
+    _add_ratios(merged)
+    return _render(merged)
+
+
+# ===== Flushing =====
+
+_flush_task: Optional[asyncio.Task] = None
+
+
+async def _flush_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.metrics_flush_seconds)
+        try:
+            # Snapshot on the loop thread, write off it
+            await asyncio.to_thread(_write_snapshot, registry.snapshot())
+        except OSError as e:
+            logger.warning(f"Failed to write metrics snapshot: {e}")
+
+
+async def init_metrics() -> None:
+    """Start writing snapshots when running with several workers"""
+    global _flush_task
+    if not settings.metrics_multiproc_dir:
+        return
+    os.makedirs(settings.metrics_multiproc_dir, exist_ok=True)
+    _flush_task = asyncio.create_task(_flush_loop(), name="metrics-flush")
+
+
+async def close_metrics() -> None:
+    """Stop flushing and write the final counters of this worker"""
+    global _flush_task
+    if _flush_task is None:
+        return
+    _flush_task.cancel()
+    try:
+        await _flush_task
+    except asyncio.CancelledError:
+        pass
+    _flush_task = None
+    try:
+        _write_snapshot(registry.snapshot())
+    except OSError as e:
+        logger.warning(f"Failed to write metrics snapshot: {e}")
+
+
+# ===== Application metrics =====
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+HTTP_ERRORS = registry.counter(
+    "http_request_errors_total", "HTTP requests that failed with a 5xx or an exception", ("method", "route")
+)
+HTTP_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests being handled")
+
+
+def _cache_counter(field: str) -> Callable[[], dict]:
+    def collect() -> dict:
+        tiers = {f"user_{tier}": stats for tier, stats in get_cache_tier_stats().items()}
+        tiers["jwt"] = get_token_cache_stats()
+        return {(name,): stats[field] for name, stats in tiers.items()}
+    return collect
+
+
+registry.callback("cache_hits_total", "Cache lookups that were hits", "counter", _cache_counter("hits"), ("cache",))
+registry.callback("cache_misses_total", "Cache lookups that were misses", "counter", _cache_counter("misses"), ("cache",))
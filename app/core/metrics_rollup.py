@@ -0,0 +1,139 @@
+"""
+Background-refreshed system metrics
+
+One aggregate query over ``pipelines`` and ``jobs`` plus process CPU and
+memory readings are taken every metrics_refresh_seconds and kept in memory,
+so /monitoring/metrics never touches Postgres on the request path.
+"""
+
+import asyncio
+import logging
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select, func, or_
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import settings
+from app.core.database import read_session
+from app.models.db_models import Job, Pipeline
+from app.models.schemas import JobStatus, PipelineStatus
+
+logger = logging.getLogger(__name__)
+
+# Process start, for uptime
+_started_at = time.monotonic()
+
+
+def uptime_seconds() -> int:
+    """Seconds since this worker process imported the app"""
+    return int(time.monotonic() - _started_at)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs: fall back to the peak RSS (bytes on macOS, KiB elsewhere)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _total_memory_bytes() -> int:
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def _aggregate_statement():
+    """Every metric from pipelines and jobs in one round trip"""
+    running_job_pipelines = select(Job.pipeline_id).where(Job.status == JobStatus.RUNNING.value)
+    return select(
+        select(func.count()).select_from(Pipeline).where(or_(
+            Pipeline.status == PipelineStatus.RUNNING,
+            Pipeline.id.in_(running_job_pipelines)
+        )).scalar_subquery().label("active_pipelines"),
+        select(func.coalesce(func.sum(Pipeline.records_processed), 0))
+        .scalar_subquery().label("total_records_processed"),
+        select(func.count()).select_from(Job).where(Job.status == JobStatus.RUNNING.value)
+        .scalar_subquery().label("running_jobs"),
+        select(func.count()).select_from(Job).where(Job.status == JobStatus.PENDING.value)
+        .scalar_subquery().label("pending_jobs"),
+    )
+
+
+class MetricsRollup:
+    """Periodically refreshed metrics snapshot served from memory"""
+
+    def __init__(self):
+        self.snapshot: Optional[dict] = None
+        self.refresh_errors = 0
+        self._task: Optional[asyncio.Task] = None
+        self._last_cpu = (time.monotonic(), time.process_time())
+
+    def _cpu_percent(self) -> float:
+        """Process CPU use since the previous reading, as a share of all cores"""
+        wall, cpu = time.monotonic(), time.process_time()
+        last_wall, last_cpu = self._last_cpu
+        self._last_cpu = (wall, cpu)
+        if wall <= last_wall:
+            return 0.0
+        percent = (cpu - last_cpu) / (wall - last_wall) / (os.cpu_count() or 1) * 100
+        return round(min(max(percent, 0.0), 100.0), 2)
+
+    def _memory_percent(self) -> float:
+        total = _total_memory_bytes()
+        if not total:
+            return 0.0
+        return round(min(_rss_bytes() / total * 100, 100.0), 2)
+
+    async def refresh(self) -> None:
+        """Take a new snapshot; on database errors the previous one is kept"""
+        try:
+            async with read_session() as session:
+                row = (await session.execute(_aggregate_statement())).one()
+        except (SQLAlchemyError, OSError) as e:
+            self.refresh_errors += 1
+            logger.warning(f"Metrics refresh failed, serving previous snapshot: {e}")
+            return
+
+        self.snapshot = {
+            "active_pipelines": row.active_pipelines,
+            "total_records_processed": row.total_records_processed,
+            "running_jobs": row.running_jobs,
+            "pending_jobs": row.pending_jobs,
+            "cpu_usage": self._cpu_percent(),
+            "memory_usage": self._memory_percent(),
+            "refreshed_at": datetime.now(timezone.utc)
+        }
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.metrics_refresh_seconds)
+            await self.refresh()
+
+    async def start(self) -> None:
+        """Take the first snapshot and start refreshing (called from the lifespan)"""
+        if self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop(), name="metrics-rollup")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Application-wide rollup, started and stopped in the lifespan
+metrics_rollup = MetricsRollup()
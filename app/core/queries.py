@@ -0,0 +1,28 @@
+"""
+Prebuilt statements for hot queries
+
+Building a select() and deriving its cache key costs more CPU than running
+a small query against a warm connection. These statements are built once at
+import with named bind parameters, so each execution only binds values:
+SQLAlchemy's compiled cache is hit on a memoized key and asyncpg reuses the
+prepared statement cached on the pooled connection.
+
+Usage:
+    await db.execute(USER_BY_USERNAME, {"username": username})
+"""
+
+from sqlalchemy import bindparam, select
+from app.core.serialization import PIPELINE_FIELDS
+from app.models.db_models import Pipeline, User
+
+# Only the columns the API returns, fetched as Core rows (no ORM identity map)
+PIPELINE_COLUMNS = [getattr(Pipeline, field) for field in PIPELINE_FIELDS]
+
+# Auth: token lookups on a user cache miss, and login
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+
+# GET /api/v2/pipelines/{pipeline_id}
+PIPELINE_BY_ID = select(*PIPELINE_COLUMNS).where(Pipeline.id == bindparam("pipeline_id"))
+
+# Existence checks before starting a pipeline or queueing a job for it
+PIPELINE_ID_EXISTS = select(Pipeline.id).where(Pipeline.id == bindparam("pipeline_id"))
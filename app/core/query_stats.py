@@ -0,0 +1,157 @@
+"""
+Per-request SQL instrumentation
+
+Cursor-execute events on the engine time every statement and attribute it
+to the request being handled, found through a ContextVar set by
+RequestContextMiddleware (SQLAlchemy runs the sync events in a greenlet
+that shares the calling task's context). Per request this yields:
+
+- query count and DB time, sent as a Server-Timing header and recorded
+  as per-route histograms
+- a slow-query log line with normalized SQL and the request ID
+- N+1 candidates: the same normalized statement run n_plus_one_threshold
+  or more times in one request
+"""
+
+import logging
+import re
+import time
+from collections import Counter as CountBy
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+from app.core.database import engine, replicas
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DB_QUERIES = registry.counter("db_queries_total", "SQL statements executed")
+DB_QUERY_DURATION = registry.histogram("db_query_duration_seconds", "SQL statement execution time")
+DB_QUERIES_PER_REQUEST = registry.histogram(
+    "http_request_db_queries", "SQL statements per HTTP request", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+DB_TIME_PER_REQUEST = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL per HTTP request", ("method", "route")
+)
+N_PLUS_ONE = registry.counter(
+    "db_n_plus_one_total", "Requests that repeated one statement n_plus_one_threshold times or more",
+    ("method", "route")
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# "$1::INTEGER", "%(id_1)s", ":id" and "?" placeholders
+_PLACEHOLDER = re.compile(r"\$\d+(?:::[A-Z]+(?:\([^)]*\))?)?|%\(\w+\)s|(?<!:):\w+|\?")
+# Expanded IN lists: "(?, ?, ?)" -> "(...)"
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and replace literals and bound parameters with ?"""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(...)", sql)
+
+
+class RequestQueryStats:
+    """SQL statements attributed to one request"""
+
+    __slots__ = ("request_id", "count", "seconds", "statements")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.count = 0
+        self.seconds = 0.0
+        # Raw statement text -> executions; normalized only when reported
+        self.statements: CountBy = CountBy()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def n_plus_one_candidates(self) -> list[tuple[str, int]]:
+        """Normalized statements repeated at least n_plus_one_threshold times"""
+        repeated: CountBy = CountBy()
+        for statement, executions in self.statements.items():
+            repeated[normalize_sql(statement)] += executions
+        return [
+            (sql, executions) for sql, executions in repeated.most_common()
+            if executions >= settings.n_plus_one_threshold
+        ]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value"""
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+# Stats of the request being handled by the current task
+request_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def report_request(stats: RequestQueryStats, method: str, route: str) -> None:
+    """Record a finished request's SQL metrics and flag N+1 candidates"""
+    labels = (method, route)
+    DB_QUERIES_PER_REQUEST.observe(stats.count, labels)
+    DB_TIME_PER_REQUEST.observe(stats.seconds, labels)
+
+    if stats.count < settings.n_plus_one_threshold:
+        return
+    candidates = stats.n_plus_one_candidates()
+    if candidates:
+        N_PLUS_ONE.inc(labels)
+        for sql, executions in candidates:
+            logger.warning(
+                f"Possible N+1 in {method} {route} (request {stats.request_id}): "
+                f"{executions} executions of {sql}"
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERIES.inc()
+    DB_QUERY_DURATION.observe(elapsed)
+
+    stats = request_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed >= settings.slow_query_threshold_seconds:
+        logger.warning(
+            f"Slow query ({elapsed:.3f}s, request {stats.request_id if stats else '-'}): "
+            f"{normalize_sql(statement)}"
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't run for a failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument_engine(async_engine: AsyncEngine) -> None:
+    """Attach the timing events to an engine"""
+    sync_engine = async_engine.sync_engine
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+instrument_engine(engine)
+for _replica in replicas:
+    instrument_engine(_replica.engine)
@@ -0,0 +1,94 @@
+"""
+Schema version check
+
+Migrations own the schema (``alembic upgrade head``, run once per deploy);
+workers only verify at startup that the database is at a revision this
+code knows. That is one SELECT instead of create_all's catalog queries for
+every table.
+
+The revision graph is read straight from the migration files rather than
+through Alembic: importing its script loader alone costs more startup time
+than the check it would serve.
+"""
+
+import logging
+import re
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+_REVISION = re.compile(r"^revision\s*(?::[^=]*)?=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*(?::[^=]*)?=\s*(.+)$", re.MULTILINE)
+_REVISION_ID = re.compile(r"['\"](\w+)['\"]")
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised when the database schema is missing or older than the code"""
+
+
+def read_revision_graph(migrations_dir: Path = MIGRATIONS_DIR) -> tuple[set[str], set[str]]:
+    """
+    Revisions defined by the migration files
+
+    Returns:
+        (all revisions, head revisions)
+    """
+    revisions, parents = set(), set()
+    for path in migrations_dir.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision is not None:
+            parents.update(_REVISION_ID.findall(down_revision.group(1)))
+    return revisions, revisions - parents
+
+
+async def check_schema_version(conn: AsyncConnection) -> str:
+    """
+    Verify the database is migrated to a head revision of this code
+
+    A revision newer than any this code knows only logs a warning, so
+    workers of the previous release keep starting while a deploy's
+    (backward-compatible) migration is already applied.
+
+    Args:
+        conn: Connection to the primary database
+
+    Returns:
+        The database's current revision
+
+    Raises:
+        SchemaVersionError: If the database is unmigrated or behind
+    """
+    revisions, heads = read_revision_graph()
+    try:
+        current = set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+    except DBAPIError as e:
+        raise SchemaVersionError(
+            "Database has no Alembic revision; run `alembic upgrade head` before starting the API"
+        ) from e
+
+    if not current:
+        raise SchemaVersionError("Database has no Alembic revision; run `alembic upgrade head`")
+    if current == heads:
+        return ", ".join(sorted(current))
+
+    unknown = current - revisions
+    if unknown:
+        logger.warning(
+            f"Database revision {', '.join(sorted(unknown))} is newer than this code "
+            f"(head {', '.join(sorted(heads))}); continuing"
+        )
+        return ", ".join(sorted(current))
+    raise SchemaVersionError(
+        f"Database is at revision {', '.join(sorted(current))} but the code expects "
+        f"{', '.join(sorted(heads))}; run `alembic upgrade head`"
+    )
@@ -1,23 +1,53 @@
 """Security utilities for password hashing and JWT tokens"""
 
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from app.core.config import settings
-
-# Password hashing context
-# truncate_error=False allows passlib to handle the 72-byte limit automatically
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__ident="2b",
-    bcrypt__truncate_error=False
+from app.core.local_cache import TTLCache
+
+# passlib and python-jose (with its cryptography backend) are imported on
+# first use: only logins hash passwords, and verified tokens are memoized,
+# so neither needs to slow down worker startup.
+
+
+@lru_cache(maxsize=None)
+def _pwd_context():
+    """Password hashing context, built on first use"""
+    from passlib.context import CryptContext
+
+    # truncate_error=False allows passlib to handle the 72-byte limit automatically
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__ident="2b",
+        bcrypt__truncate_error=False
+    )
+
+# Dedicated pool for bcrypt so hashing never runs on the event loop
+# (bcrypt releases the GIL, so threads give real parallelism here)
+_hash_executor: Optional[ThreadPoolExecutor] = None
+# Bounds running + queued hashing jobs
+_hash_slots = asyncio.Semaphore(
+    settings.password_hash_workers + settings.password_hash_queue_size
 )
 
 # JWT settings
 ALGORITHM = "HS256"
 
+# Verified claims keyed by token digest; entries expire no later than "exp"
+_token_cache = TTLCache(
+    "jwt_claims",
+    maxsize=settings.token_cache_max_entries,
+    ttl_seconds=settings.access_token_expire_minutes * 60
+)
+# Secret the cached claims were verified with
+_token_cache_secret: Optional[str] = None
+
 
 def _truncate_password(password: str) -> str:
     """
@@ -36,7 +66,7 @@ def _truncate_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
     plain_password = _truncate_password(plain_password)
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -46,7 +76,88 @@ def get_password_hash(password: str) -> str:
     Note: Bcrypt has a 72-byte limit, so passwords are truncated if needed
     """
     password = _truncate_password(password)
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the hashing pool stays saturated past the queue timeout"""
+
+
+def init_password_hasher() -> None:
+    """Create the bounded password hashing thread pool"""
+    global _hash_executor
+
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="password-hash"
+        )
+
+
+def close_password_hasher() -> None:
+    """
+    Shut down the password hashing thread pool
+
+    Called from the lifespan, so it doesn't wait: queued calls are cancelled
+    and a bcrypt call already running finishes on its thread without
+    holding up the rest of the shutdown.
+    """
+    global _hash_executor
+
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+def _release_hash_slot(loop: asyncio.AbstractEventLoop) -> None:
+    try:
+        loop.call_soon_threadsafe(_hash_slots.release)
+    except RuntimeError:
+        # A call that outlived shutdown: the loop is already closed
+        pass
+
+
+async def _run_in_hash_pool(func, *args):
+    """
+    Run a bcrypt call on the hashing pool
+
+    Waits at most settings.password_hash_queue_timeout_seconds for a slot.
+    The slot is held until the executor is done with the call, not until
+    the caller stops waiting: a cancelled request whose bcrypt call is
+    already running keeps its slot, so the executor's queue stays bounded
+    by the number of slots.
+
+    Raises:
+        PasswordHasherBusyError: If no slot frees up in time
+    """
+    try:
+        await asyncio.wait_for(
+            _hash_slots.acquire(),
+            timeout=settings.password_hash_queue_timeout_seconds
+        )
+    except asyncio.TimeoutError:
+        raise PasswordHasherBusyError("Password hashing pool is saturated")
+
+    loop = asyncio.get_running_loop()
+    try:
+        init_password_hasher()
+        future = _hash_executor.submit(func, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    # Runs on the worker thread (or here, if cancelled before it started)
+    future.add_done_callback(lambda _: _release_hash_slot(loop))
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop"""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_in_hash_pool(get_password_hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -68,22 +179,55 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
 
     to_encode.update({"exp": expire})
+    from jose import jwt
+
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def _token_digest(token: str) -> bytes:
+    """Digest used as cache key so raw tokens are not kept in memory"""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     """
     Decode and verify a JWT token
 
+    Successfully verified claims are memoized until the token's expiry, so
+    repeat requests with the same token skip the parse and HMAC check.
+    Rotating settings.secret_key drops every memoized entry.
+
     Args:
         token: JWT token string
 
     Returns:
         Dictionary of token claims or None if invalid
     """
+    global _token_cache_secret
+
+    if _token_cache_secret != settings.secret_key:
+        _token_cache.clear()
+        _token_cache_secret = settings.secret_key
+
+    key = _token_digest(token)
+    payload = _token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    exp = payload.get("exp")
+    ttl = exp - time.time() if isinstance(exp, (int, float)) else None
+    _token_cache.set(key, payload, ttl_seconds=ttl)
+    return dict(payload)
+
+
+def get_token_cache_stats() -> dict:
+    """Hit/miss counters of the verified token cache"""
+    return _token_cache.stats()
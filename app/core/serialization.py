@@ -0,0 +1,76 @@
+"""
+Fast JSON serialization for hot read endpoints
+
+Returning a Response from an endpoint bypasses FastAPI's response_model
+validation, so rows are validated at most once (or not at all in fast
+mode) before being turned into JSON bytes.
+"""
+
+import orjson
+from typing import Any, Iterable, List, Optional
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.core.config import settings
+from app.models.schemas import Pipeline as PipelineSchema
+
+# UTC datetimes as "Z" to match Pydantic's JSON output
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Columns serialized for a pipeline, in PipelineSchema field order
+PIPELINE_FIELDS = tuple(PipelineSchema.model_fields)
+
+# Precompiled once and reused for every request
+_pipeline_rows_adapter = TypeAdapter(List[PipelineSchema])
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with orjson"""
+    return orjson.dumps(content, option=_ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def pipeline_row_to_dict(row: Any) -> dict:
+    """Map a pipeline row (ORM object or Core row) to its API shape"""
+    data = {field: getattr(row, field) for field in PIPELINE_FIELDS}
+    if data["tags"] is None:
+        data["tags"] = []
+    return data
+
+
+def serialize_pipeline_rows(rows: Iterable[Any]) -> bytes:
+    """
+    Serialize pipeline rows to a JSON array
+
+    With settings.fast_serialization the rows go straight to orjson and are
+    trusted as stored. Otherwise they are validated once through a
+    precompiled TypeAdapter, which also dumps them to JSON.
+    """
+    if settings.fast_serialization:
+        return dumps([pipeline_row_to_dict(row) for row in rows])
+
+    validated = _pipeline_rows_adapter.validate_python(list(rows), from_attributes=True)
+    return _pipeline_rows_adapter.dump_json(validated)
+
+
+def serialize_pipeline_list(
+    rows: Iterable[Any],
+    total_count: Optional[int],
+    next_cursor: Optional[str],
+    filters_applied: dict,
+    api_version: str = "v2"
+) -> bytes:
+    """Serialize a PipelineListResponse body without building the model"""
+    envelope = dumps({
+        "total_count": total_count,
+        "next_cursor": next_cursor,
+        "filters_applied": filters_applied,
+        "api_version": api_version
+    })
+    # Splice the pre-serialized array in front of the other keys
+    return b'{"pipelines":' + serialize_pipeline_rows(rows) + b"," + envelope[1:]
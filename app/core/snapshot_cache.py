@@ -0,0 +1,139 @@
+"""Versioned, pre-serialized response snapshots with strong ETags"""
+
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Hashable, Optional
+from fastapi import Request, Response, status
+from app.core.local_cache import TTLCache
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """A serialized response body and its validators"""
+    version: int
+    etag: str
+    body: bytes
+    gzip_body: Optional[bytes] = None
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    True if Accept-Encoding allows gzip
+
+    Codings are matched as whole tokens with their q-values: "gzip;q=0"
+    refuses gzip, and "*" covers it unless gzip is listed on its own.
+    """
+    if not accept_encoding:
+        return False
+    wildcard_q = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = 0.0
+        if coding == "gzip":
+            return q > 0
+        if coding == "*":
+            wildcard_q = q
+    return wildcard_q is not None and wildcard_q > 0
+
+
+class SnapshotCache:
+    """
+    Per-worker cache of serialized responses keyed by request parameters
+
+    Every write to the underlying data calls bump(), which makes all
+    snapshots built from an older version stale. Snapshots also expire
+    after a short TTL, which bounds staleness for writes made by other
+    workers.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl_seconds: float, gzip_enabled: bool = True):
+        self.name = name
+        self.gzip_enabled = gzip_enabled
+        self.version = 0
+        self._entries = TTLCache(name, maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    def bump(self) -> None:
+        """Invalidate every snapshot; the next read rebuilds it"""
+        self.version += 1
+        self._entries.clear()
+
+    def get(self, key: Hashable) -> Optional[Snapshot]:
+        """Return the snapshot for key if it is current"""
+        snapshot = self._entries.get(key)
+        if snapshot is None or snapshot.version != self.version:
+            return None
+        return snapshot
+
+    def put(self, key: Hashable, body: bytes, version: int) -> Snapshot:
+        """
+        Store a serialized body
+
+        Args:
+            key: Request parameters the body was built for
+            body: Serialized response body
+            version: Value of self.version read *before* querying the data,
+                so a write racing with the rebuild is not hidden
+        """
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        gzip_body = None
+        if self.gzip_enabled and len(body) >= GZIP_MIN_SIZE:
+            gzip_body = gzip.compress(body, compresslevel=6)
+        snapshot = Snapshot(version=version, etag=etag, body=body, gzip_body=gzip_body)
+        if version == self.version:
+            self._entries.set(key, snapshot)
+        return snapshot
+
+    def stats(self) -> dict:
+        return {"version": self.version, **self._entries.stats()}
+
+
+def snapshot_response(
+    snapshot: Snapshot,
+    request: Request,
+    media_type: str = "application/json"
+) -> Response:
+    """Build a 200 (optionally gzipped) or 304 response for a snapshot"""
+    use_gzip = snapshot.gzip_body is not None and _accepts_gzip(request.headers.get("accept-encoding"))
+    # Strong ETags must differ per content-coding
+    etag = snapshot.etag[:-1] + '-gzip"' if use_gzip else snapshot.etag
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding, Authorization"
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzip_body, media_type=media_type, headers=headers)
+
+    return Response(content=snapshot.body, media_type=media_type, headers=headers)
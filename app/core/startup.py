@@ -0,0 +1,51 @@
+"""
+Startup phase timing
+
+The lifespan wraps each startup step in a phase; once the worker is ready
+it logs one line with the time spent importing the app and in each phase,
+and every phase is recorded in the app_startup_phase_seconds histogram so
+slow cold starts show up on the dashboards that drive autoscaling.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from app.core.metrics import registry
+
+STARTUP_PHASE_SECONDS = registry.histogram(
+    "app_startup_phase_seconds", "Worker startup time per phase (import, lifespan steps, total)",
+    ("phase",),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+
+class StartupTimer:
+    """Times named startup phases and reports them once"""
+
+    def __init__(self, import_seconds: float = 0.0):
+        self.phases: list[tuple[str, float]] = [("import", import_seconds)] if import_seconds else []
+        self._started_at = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self) -> str:
+        """Record the phases in the metrics and summarize them in one line"""
+        total = sum(seconds for name, seconds in self.phases if name == "import")
+        total += time.perf_counter() - self._started_at
+        for name, seconds in self.phases:
+            STARTUP_PHASE_SECONDS.observe(seconds, (name,))
+        STARTUP_PHASE_SECONDS.observe(total, ("total",))
+
+        slowest = max(self.phases, key=lambda phase: phase[1], default=None)
+        summary = f"Worker ready in {total:.3f}s: " + ", ".join(
+            f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases
+        )
+        if slowest is not None:
+            summary += f" (slowest: {slowest[0]})"
+        return summary
@@ -1,9 +1,9 @@
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from typing import Optional
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.queries import USER_BY_USERNAME
 from app.core.security import decode_access_token
 from app.core.cache import get_cached_user, cache_user
 from app.models.db_models import User
@@ -13,11 +13,31 @@ security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> User:
     """
     Extract and validate user from JWT bearer token with caching
 
+    Args:
+        credentials: HTTP Bearer token from Authorization header
+        db: Database session
+
+    Returns:
+        User object from database/cache
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    return await authenticate_token(credentials.credentials, db)
+
+
+async def authenticate_token(token: str, db: AsyncSession) -> User:
+    """
+    Resolve the user of a JWT access token with caching
+
+    Also used by endpoints that can't take an Authorization header, such as
+    WebSockets.
+
     Flow:
     1. Decode JWT token
     2. Check cache for user data
@@ -26,7 +46,7 @@ async def get_current_user(
     5. Return user object
 
     Args:
-        credentials: HTTP Bearer token from Authorization header
+        token: Encoded JWT access token
         db: Database session
 
     Returns:
@@ -35,8 +55,6 @@ async def get_current_user(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    token = credentials.credentials
-
     # Decode JWT token (no DB, just cryptographic verification)
     payload = decode_access_token(token)
     if payload is None:
@@ -56,7 +74,7 @@ async def get_current_user(
         )
 
     # Try to get user from cache first
-    cached_user_data = get_cached_user(username)
+    cached_user_data = await get_cached_user(username)
     if cached_user_data:
         # Cache hit! Reconstruct User object from cached data
         user = User(
@@ -70,8 +88,7 @@ async def get_current_user(
         )
     else:
         # Cache miss - query database
-        query = select(User).where(User.username == username)
-        result = await db.execute(query)
+        result = await db.execute(USER_BY_USERNAME, {"username": username})
         user = result.scalar_one_or_none()
 
         if user is None:
@@ -91,7 +108,7 @@ async def get_current_user(
             "is_active": user.is_active,
             "created_at": str(user.created_at)
         }
-        cache_user(username, user_data)
+        await cache_user(username, user_data)
 
     # Check if user is active
     if not user.is_active:
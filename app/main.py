@@ -1,22 +1,82 @@
+import time
+
+_import_started = time.perf_counter()
+
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.routers import pipelines, monitoring, jobs, auth
-from app.middleware.request_id import request_id_middleware
-from app.middleware.timing import timing_middleware
-from app.core.database import init_db, close_db
+from app.routers import pipelines, monitoring, jobs, auth, events, metrics
+from app.middleware.request_context import RequestContextMiddleware, RequestIdLogFilter
+from app.core.database import init_db, close_db, warm_up_pools
+from app.core.cache import init_cache, close_cache
+from app.core.security import init_password_hasher, close_password_hasher
+from app.core.job_runner import job_runner
+from app.core.metrics import init_metrics, close_metrics
+from app.core.metrics_rollup import metrics_rollup
+from app.core.startup import StartupTimer
 from app.core.config import settings
 
+# Time spent importing the app (routers, models, SQLAlchemy, FastAPI)
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+logger = logging.getLogger(__name__)
+
+
+def _configure_logging() -> None:
+    """
+    Send the app.* loggers to stderr, each record tagged with its request ID
+
+    uvicorn only configures its own loggers, so without this handler the
+    app's records below WARNING were dropped.
+    """
+    app_logger = logging.getLogger("app")
+    if any(isinstance(f, RequestIdLogFilter) for h in app_logger.handlers for f in h.filters):
+        return
+    handler = logging.StreamHandler()
+    handler.addFilter(RequestIdLogFilter())
+    handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+    ))
+    app_logger.addHandler(handler)
+    app_logger.setLevel(settings.log_level.upper())
+    # Already handled here; don't print it again through a root handler
+    app_logger.propagate = False
+    # SQLAlchemy logs our pool subclass under its module; keep it as quiet
+    # as its own pools (sqlalchemy.pool) are by default
+    logging.getLogger("app.core.database.TimedQueuePool").setLevel(logging.WARNING)
+
+
+_configure_logging()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
-    # Startup
-    print("Initializing database...")
-    await init_db()
-    print("Database initialized successfully")
+    # Startup (each phase is timed and reported once the worker is ready)
+    startup = StartupTimer(import_seconds=IMPORT_SECONDS)
+    with startup.phase("database"):
+        await init_db()
+    with startup.phase("db_pool_warm_up"):
+        await warm_up_pools()
+    with startup.phase("redis"):
+        await init_cache()
+    with startup.phase("job_runner"):
+        init_password_hasher()
+        await job_runner.start()
+    with startup.phase("metrics"):
+        await metrics_rollup.start()
+        await init_metrics()
+    logger.info(startup.report())
     yield
     # Shutdown
+    await close_metrics()
+    await metrics_rollup.stop()
+    print("Stopping job runner...")
+    await job_runner.stop()
+    close_password_hasher()
+    print("Closing Redis cache connections...")
+    await close_cache()
     print("Closing database connections...")
     await close_db()
     print("Database connections closed")
@@ -41,15 +101,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include middleware
-app.middleware("http")(request_id_middleware)
-app.middleware("http")(timing_middleware)
+# Request ID + timing (pure ASGI, outermost so timing covers everything)
+app.add_middleware(RequestContextMiddleware)
 
 # Include routers with proper organization
 app.include_router(auth.router)
 app.include_router(pipelines.router)
 app.include_router(monitoring.router)
 app.include_router(jobs.router)
+app.include_router(events.router)
+app.include_router(metrics.router)
 
 # Root endpoint
 @app.get("/", tags=["Root"])
@@ -0,0 +1,134 @@
+"""
+Request context middleware - request ID, response timing, HTTP and SQL metrics
+
+A single pure ASGI middleware replaces the former request_id and timing
+``@app.middleware("http")`` functions, which each wrapped every request in
+Starlette's BaseHTTPMiddleware machinery (extra task, anyio streams and
+response copies). Headers are added by rewriting ``http.response.start``.
+"""
+
+import uuid
+import time
+import logging
+from contextvars import ContextVar
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import (
+    READ_PRIMARY_COOKIE, RequestDbContext, read_primary_until, request_db_context
+)
+from app.core.metrics import HTTP_DURATION, HTTP_ERRORS, HTTP_IN_FLIGHT, HTTP_REQUESTS
+from app.core.query_stats import RequestQueryStats, report_request, request_query_stats
+
+SLOW_REQUEST_THRESHOLD = 1.0
+
+# Route label for requests no route matched (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+logger = logging.getLogger(__name__)
+
+# Request ID of the request being handled by the current task
+request_id_ctx: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Get the current request ID (None outside of a request)"""
+    return request_id_ctx.get()
+
+
+class RequestIdLogFilter(logging.Filter):
+    """Logging filter exposing the current request ID as %(request_id)s (see app.main)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_ctx.get() or "-"
+        return True
+
+
+class RequestContextMiddleware:
+    """
+    Tag each request with an ID and measure its processing time.
+
+    - Reuses the incoming X-Request-ID header or generates a UUID4
+    - Stores the ID in request_id_ctx for loggers and downstream code
+    - Adds X-Request-ID and X-Response-Time (ms until headers are sent)
+    - Logs warning for slow requests (full response, body included)
+    - Records request count, errors and latency per route template
+    - Attributes SQL statements to the request: Server-Timing header
+      (statements run before the response starts), per-route query
+      metrics and N+1 warnings
+    - After a committed write, sets the read-your-writes cookie (when
+      read_your_writes_seconds is enabled) so the client's next reads go
+      to the primary
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.perf_counter_ns()
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = str(uuid.uuid4())
+
+        token = request_id_ctx.set(request_id)
+        query_stats = RequestQueryStats(request_id)
+        stats_token = request_query_stats.set(query_stats)
+        db_context = RequestDbContext()
+        db_token = request_db_context.set(db_context)
+        status_code = 500
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Response-Time"] = f"{duration_ms:.2f}ms"
+                headers.append("Server-Timing", query_stats.server_timing())
+                if db_context.committed_write and settings.read_your_writes_seconds > 0:
+                    until = f"{read_primary_until():.3f}"
+                    # Cookie for browsers; API clients echo the header
+                    headers["X-Read-Primary-Until"] = until
+                    headers.append(
+                        "Set-Cookie",
+                        f"{READ_PRIMARY_COOKIE}={until}; "
+                        f"Max-Age={int(settings.read_your_writes_seconds) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                    )
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            duration = (time.perf_counter_ns() - start_ns) / 1_000_000_000
+            HTTP_IN_FLIGHT.dec()
+
+            # Set by the router on match; the template, not the raw path
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUESTS.inc((method, route_path, str(status_code)))
+            HTTP_DURATION.observe(duration, (method, route_path))
+            if status_code >= 500:
+                HTTP_ERRORS.inc((method, route_path))
+            report_request(query_stats, method, route_path)
+
+            # Log slow requests
+            if duration > SLOW_REQUEST_THRESHOLD:
+                logger.warning(
+                    f"Slow request: {scope['method']} {scope['path']} "
+                    f"took {duration:.3f}s"
+                )
+            request_db_context.reset(db_token)
+            request_query_stats.reset(stats_token)
+            request_id_ctx.reset(token)
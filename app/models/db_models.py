@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum as SQLEnum, ARRAY
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum as SQLEnum, Index
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from datetime import datetime
 from app.core.database import Base
@@ -19,6 +20,11 @@ class Pipeline(Base):
     records_processed = Column(Integer, default=0)
     tags = Column(ARRAY(String), default=[])
 
+    __table_args__ = (
+        # Serves "tags @> ARRAY[...]" filters
+        Index("ix_pipelines_tags", "tags", postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"<Pipeline(id={self.id}, name={self.name}, status={self.status})>"
 
@@ -49,6 +55,10 @@ class Job(Base):
     status = Column(String(50), nullable=False, default="pending")
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    # Refreshed by the owning runner while running; stale -> worker lost
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    # Set by POST /jobs/{id}/cancel; the owning runner cancels on its next heartbeat
+    cancel_requested_at = Column(DateTime(timezone=True), nullable=True)
     records_processed = Column(Integer, default=0)
     error_message = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -36,6 +36,10 @@ class PipelineStatus(str, Enum):
     FAILED = "failed"
     PENDING = "pending"
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
 class PipelineBase(BaseModel):
     name: str = Field(..., description="Pipeline name")
     status: PipelineStatus
@@ -50,7 +54,8 @@ class Pipeline(PipelineBase):
 
 class PipelineListResponse(BaseModel):
     pipelines: List[Pipeline]
-    total_count: int
+    total_count: Optional[int] = Field(None, description="Only computed when include_total=true")
+    next_cursor: Optional[str] = Field(None, description="Pass as 'after' to fetch the next page")
     filters_applied: Dict[str, Any] = {}
     api_version: str = "v2"
 
@@ -61,6 +66,23 @@ class PipelineActionResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
     performed_by: str
 
+class PipelineBatchStartRequest(BaseModel):
+    pipeline_ids: List[int] = Field(
+        ..., min_length=1, max_length=10000, description="Pipelines to start"
+    )
+
+class PipelineStartResult(BaseModel):
+    pipeline_id: int
+    started: bool
+    error: Optional[str] = None
+
+class PipelineBatchStartResponse(BaseModel):
+    results: List[PipelineStartResult]
+    started: int
+    rejected: int
+    timestamp: datetime = Field(default_factory=datetime.now)
+    performed_by: str
+
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
@@ -73,9 +95,72 @@ class HealthResponse(BaseModel):
     version: str
     uptime_seconds: Optional[int] = None
 
+class DependencyHealth(BaseModel):
+    status: str = Field(..., description="up, down, saturated or disabled")
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    details: Dict[str, Any] = Field(default={}, description="Pool size and saturation")
+
+class ReadinessResponse(BaseModel):
+    status: str = Field(..., description="healthy, degraded or unhealthy")
+    timestamp: datetime
+    checked_at: datetime = Field(..., description="When the dependencies were last probed")
+    cached: bool
+    dependencies: Dict[str, DependencyHealth]
+
 class MetricsResponse(BaseModel):
     active_pipelines: int
     total_records_processed: int
     cpu_usage: float = Field(..., ge=0, le=100)
     memory_usage: float = Field(..., ge=0, le=100)
-    requested_by: str
\ No newline at end of file
+    running_jobs: int = 0
+    pending_jobs: int = 0
+    refreshed_at: Optional[datetime] = Field(None, description="When the metrics were last aggregated")
+    db_pools: Dict[str, Dict[str, Any]] = Field(default={}, description="Live connection pool occupancy")
+    requested_by: str
+
+# ===== Job Schemas =====
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobCreate(BaseModel):
+    pipeline_id: int = Field(..., description="Pipeline to run")
+
+class Job(BaseModel):
+    id: int = Field(..., description="Job ID")
+    pipeline_id: int
+    status: JobStatus
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    records_processed: int = Field(0, ge=0)
+    error_message: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+class JobListResponse(BaseModel):
+    jobs: List[Job]
+    count: int
+
+class JobActionResponse(BaseModel):
+    message: str
+    job_id: int
+    status: JobStatus
+    timestamp: datetime = Field(default_factory=datetime.now)
+
+class JobBatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the spec in the request")
+    pipeline_id: int
+    accepted: bool
+    job_id: Optional[int] = None
+    error: Optional[str] = None
+
+class JobBatchResponse(BaseModel):
+    results: List[JobBatchItemResult]
+    accepted: int
+    rejected: int
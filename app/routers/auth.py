@@ -4,9 +4,11 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.core.database import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.database import get_read_db
+from app.core.queries import USER_BY_USERNAME
+from app.core.security import (
+    verify_password_async, create_access_token, PasswordHasherBusyError
+)
 from app.core.config import settings
 from app.models.db_models import User
 from app.models.schemas import Token, UserResponse
@@ -21,7 +23,7 @@ router = APIRouter(
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Login endpoint to obtain JWT access token
@@ -38,12 +40,22 @@ async def login(
         ```
     """
     # Query user from database
-    query = select(User).where(User.username == form_data.username)
-    result = await db.execute(query)
+    result = await db.execute(USER_BY_USERNAME, {"username": form_data.username})
     user = result.scalar_one_or_none()
 
-    # Verify user exists and password is correct
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Verify user exists and password is correct (bcrypt runs off the event loop)
+    try:
+        password_ok = user is not None and await verify_password_async(
+            form_data.password, user.hashed_password
+        )
+    except PasswordHasherBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login is temporarily overloaded, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -0,0 +1,120 @@
+"""Live status endpoints - stream pipeline and job events over SSE or WebSocket"""
+
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import TooManySubscribersError, has_capacity, subscribe, unsubscribe
+from app.dependencies.auth import authenticate_token, require_data_engineer
+
+router = APIRouter(
+    prefix="/api/v1/events",
+    tags=["Events"],
+    responses={503: {"description": "Too many connected clients"}}
+)
+
+
+async def _sse_stream(pipeline_id: Optional[int], job_id: Optional[int]) -> AsyncIterator[str]:
+    # Subscribe inside the generator: its finally only runs once started
+    try:
+        subscriber = subscribe(pipeline_id=pipeline_id, job_id=job_id)
+    except TooManySubscribersError:
+        # Lost the race for the last slot; the client reconnects after "retry"
+        return
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event_type, data = await asyncio.wait_for(
+                    subscriber.get(), timeout=settings.event_heartbeat_seconds
+                )
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event_type}\ndata: {data}\n\n"
+    finally:
+        unsubscribe(subscriber)
+
+
+# Not a router dependency: it would also run on the WebSocket route, whose
+# token comes from the query string rather than an Authorization header
+@router.get(
+    "/stream",
+    summary="Stream status events (SSE)",
+    dependencies=[Depends(require_data_engineer)]
+)
+async def stream_events(
+    pipeline_id: Optional[int] = Query(None, description="Only events of this pipeline"),
+    job_id: Optional[int] = Query(None, description="Only events of this job")
+):
+    """
+    Server-Sent Events stream of pipeline and job status changes
+
+    Event types are "pipeline", "job" and "lagged"; the latter reports how
+    many events were dropped because the client read too slowly.
+    """
+    if not has_capacity():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event subscribers, please retry later",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        _sse_stream(pipeline_id, job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def events_websocket(
+    websocket: WebSocket,
+    token: str = Query(..., description="JWT access token"),
+    pipeline_id: Optional[int] = None,
+    job_id: Optional[int] = None
+):
+    """
+    WebSocket stream of pipeline and job status changes
+
+    Browsers can't set an Authorization header on a WebSocket, so the
+    access token is passed as the ``token`` query parameter; like the
+    pipeline and job endpoints it requires the data engineer or admin role.
+    Messages are JSON objects of the form {"event": type, "data": event}.
+    """
+    # Short-lived session so the connection isn't held for the socket's lifetime
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await authenticate_token(token, db)
+        await require_data_engineer(user)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        subscriber = subscribe(pipeline_id=pipeline_id, job_id=job_id)
+    except TooManySubscribersError:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    async def pump() -> None:
+        while True:
+            event_type, data = await subscriber.get()
+            await websocket.send_text(f'{{"event":"{event_type}","data":{data}}}')
+
+    async def drain() -> None:
+        # Client messages are ignored; receiving is how a disconnect is seen
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(pump()), asyncio.create_task(drain())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        unsubscribe(subscriber)
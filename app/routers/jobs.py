@@ -1,16 +1,279 @@
-from fastapi import APIRouter
-from datetime import datetime
+"""Job endpoints - submit, inspect and cancel pipeline runs"""
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, insert, func
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.events import publish_event, job_event
+from app.core.job_runner import job_runner, JobQueueFullError
+from app.core.queries import PIPELINE_ID_EXISTS
+from app.dependencies.auth import require_data_engineer, get_current_user
+from app.models.db_models import Job as JobModel, Pipeline as PipelineModel, User
+from app.models.schemas import (
+    Job as JobSchema, JobCreate, JobListResponse, JobActionResponse, JobStatus,
+    JobBatchItemResult, JobBatchResponse, ErrorResponse
+)
 
 router = APIRouter(
     prefix="/api/v1/jobs",
     tags=["Jobs"],
+    dependencies=[Depends(require_data_engineer)],
     responses={503: {"description": "Service unavailable"}}
 )
 
-@router.get("/")
-def get_jobs():
-    return {"jobs": []}
+_TERMINAL_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Job queue is full, please retry later",
+        headers={"Retry-After": "5"},
+    )
+
+
+@router.get("/", response_model=JobListResponse, summary="List jobs")
+async def get_jobs(
+    pipeline_id: Optional[int] = None,
+    status_filter: Optional[JobStatus] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the most recent jobs, optionally filtered by pipeline and status"""
+    query = select(JobModel)
+    if pipeline_id is not None:
+        query = query.where(JobModel.pipeline_id == pipeline_id)
+    if status_filter:
+        query = query.where(JobModel.status == status_filter.value)
+    query = query.order_by(JobModel.id.desc()).limit(limit)
+
+    result = await db.execute(query)
+    jobs = [JobSchema.model_validate(j) for j in result.scalars().all()]
+    return JobListResponse(jobs=jobs, count=len(jobs))
+
+
+@router.get("/runner", summary="Job runner stats")
+def get_runner_stats():
+    """Queue depth and worker utilization of this API worker's job runner"""
+    return job_runner.stats()
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobSchema,
+    responses={404: {"model": ErrorResponse, "description": "Job not found"}},
+    summary="Get job by ID"
+)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a job's current state"""
+    job = await db.get(JobModel, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    return JobSchema.model_validate(job)
+
+
+@router.post(
+    "/",
+    response_model=JobSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={404: {"model": ErrorResponse, "description": "Pipeline not found"}},
+    summary="Submit a job"
+)
+async def create_job(
+    job_in: JobCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue a run of a pipeline
+
+    Returns immediately with the pending job; poll GET /api/v1/jobs/{id}
+    for progress. Returns 503 when the job queue is full.
+    """
+    # Cheap check first so a full queue costs no INSERT
+    if job_runner.is_full():
+        raise _queue_full()
+
+    pipeline_exists = await db.scalar(PIPELINE_ID_EXISTS, {"pipeline_id": job_in.pipeline_id})
+    if pipeline_exists is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Pipeline {job_in.pipeline_id} not found"
+        )
+
+    job = JobModel(pipeline_id=job_in.pipeline_id, status=JobStatus.PENDING.value)
+    db.add(job)
+    # Commit before enqueueing so a worker can claim the row
+    await db.commit()
+
+    try:
+        job_runner.submit(job.id, job.pipeline_id)
+    except JobQueueFullError:
+        # Lost the race for the last slot; don't leave an orphan pending job
+        job.status = JobStatus.FAILED.value
+        job.error_message = "Job queue is full"
+        job.completed_at = func.now()
+        await db.commit()
+        raise _queue_full()
+
+    await publish_event(job_event(job.id, job.pipeline_id, status=JobStatus.PENDING.value))
+    return JobSchema.model_validate(job)
+
+
+@router.post(
+    "/batch",
+    response_model=JobBatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit many jobs",
+)
+async def create_jobs_batch(
+    job_specs: List[JobCreate] = Body(
+        ..., min_length=1, max_length=settings.job_batch_max_size,
+        description="Job specs; each one is accepted or rejected on its own"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue many pipeline runs in one request
+
+    All pipeline ids are checked with one query and accepted jobs are
+    written with a single multi-row INSERT ... RETURNING. A spec that
+    fails (unknown pipeline, queue full) is reported in its result entry
+    without aborting the rest of the batch.
+    """
+    requested_ids = {spec.pipeline_id for spec in job_specs}
+    existing_ids = set((await db.scalars(
+        select(PipelineModel.id).where(PipelineModel.id.in_(requested_ids))
+    )).all())
+
+    free_slots = job_runner.free_slots()
+    results: List[JobBatchItemResult] = []
+    accepted: List[JobBatchItemResult] = []
+    for index, spec in enumerate(job_specs):
+        result = JobBatchItemResult(index=index, pipeline_id=spec.pipeline_id, accepted=False)
+        if spec.pipeline_id not in existing_ids:
+            result.error = f"Pipeline {spec.pipeline_id} not found"
+        elif len(accepted) >= free_slots:
+            result.error = "Job queue is full"
+        else:
+            result.accepted = True
+            accepted.append(result)
+        results.append(result)
+
+    if accepted:
+        rows = [
+            {"pipeline_id": result.pipeline_id, "status": JobStatus.PENDING.value}
+            for result in accepted
+        ]
+        inserted = await db.execute(
+            insert(JobModel).returning(JobModel.id, sort_by_parameter_order=True),
+            rows
+        )
+        for result, job_id in zip(accepted, inserted.scalars().all()):
+            result.job_id = job_id
+        # Commit before enqueueing so workers can claim the rows
+        await db.commit()
+
+        overflow = []
+        for result in accepted:
+            try:
+                job_runner.submit(result.job_id, result.pipeline_id)
+            except JobQueueFullError:
+                # Slots were taken by a concurrent request since we counted
+                result.accepted = False
+                result.error = "Job queue is full"
+                overflow.append(result.job_id)
+
+        if overflow:
+            await db.execute(
+                update(JobModel)
+                .where(JobModel.id.in_(overflow))
+                .values(
+                    status=JobStatus.FAILED.value,
+                    error_message="Job queue is full",
+                    completed_at=func.now()
+                )
+            )
+            await db.commit()
+
+        for result in accepted:
+            if result.accepted:
+                await publish_event(job_event(
+                    result.job_id, result.pipeline_id, status=JobStatus.PENDING.value
+                ))
+
+    accepted_count = sum(1 for result in results if result.accepted)
+    return JobBatchResponse(
+        results=results,
+        accepted=accepted_count,
+        rejected=len(results) - accepted_count
+    )
+
+
+@router.post(
+    "/{job_id}/cancel",
+    response_model=JobActionResponse,
+    responses={
+        404: {"model": ErrorResponse, "description": "Job not found"},
+        409: {"model": ErrorResponse, "description": "Job can't be cancelled"}
+    },
+    summary="Cancel a job"
+)
+async def cancel_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Cancel a pending or running job"""
+    # A pending job is cancelled in the database; the runner skips it
+    result = await db.execute(
+        update(JobModel)
+        .where(JobModel.id == job_id, JobModel.status == JobStatus.PENDING.value)
+        .values(status=JobStatus.CANCELLED.value, completed_at=func.now())
+        .returning(JobModel.pipeline_id)
+    )
+    pipeline_id = result.scalar_one_or_none()
+    if pipeline_id is not None:
+        await db.commit()
+        await publish_event(job_event(job_id, pipeline_id, status=JobStatus.CANCELLED.value))
+        return JobActionResponse(
+            message=f"Job {job_id} cancelled",
+            job_id=job_id,
+            status=JobStatus.CANCELLED
+        )
+
+    job_status = await db.scalar(select(JobModel.status).where(JobModel.id == job_id))
+    if job_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    if JobStatus(job_status) in _TERMINAL_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} already {job_status}"
+        )
 
-@router.post("/")
-def create_job():
-    return {"message": "created"}
\ No newline at end of file
+    # Running: flag the row for whichever API worker owns the job
+    flagged = await db.scalar(
+        update(JobModel)
+        .where(JobModel.id == job_id, JobModel.status == JobStatus.RUNNING.value)
+        .values(cancel_requested_at=func.now())
+        .returning(JobModel.id)
+    )
+    if flagged is None:
+        # Finished between the two statements
+        job_status = await db.scalar(select(JobModel.status).where(JobModel.id == job_id))
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job {job_id} already {job_status}"
+        )
+    await db.commit()
+    await job_runner.request_cancel(job_id)
+    return JobActionResponse(
+        message=f"Cancellation requested for job {job_id}",
+        job_id=job_id,
+        status=JobStatus.RUNNING
+    )
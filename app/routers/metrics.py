@@ -0,0 +1,21 @@
+"""Prometheus scrape endpoint"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import render_metrics
+
+router = APIRouter(tags=["Monitoring"])
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics",
+    description="Request, database pool and cache metrics of all API workers - public endpoint"
+)
+async def prometheus_metrics():
+    """Metrics in the Prometheus text format, aggregated across workers"""
+    return PlainTextResponse(await render_metrics(), media_type=CONTENT_TYPE)
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from datetime import datetime
+from app.core.database import get_all_pool_stats
+from app.core.health import health_checker
+from app.core.metrics_rollup import metrics_rollup, uptime_seconds
 from app.dependencies.auth import get_current_user, require_admin
-from app.models.schemas import HealthResponse, MetricsResponse, ErrorResponse
+from app.models.db_models import User
+from app.models.schemas import HealthResponse, ReadinessResponse, MetricsResponse, ErrorResponse
 
 router = APIRouter(
     prefix="/api/v1/monitoring",
@@ -17,21 +21,81 @@ router = APIRouter(
     summary="Health check",
     description="System health status - public endpoint"
 )
-def health_check():
-    """System health check with structured response"""
+async def health_check(response: Response):
+    """
+    System health check with structured response
+
+    Reflects the cached dependency probes; returns 503 when unhealthy.
+    """
+    result, _ = await health_checker.check()
+    if result["status"] == "unhealthy":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
     return HealthResponse(
-        status="healthy",
+        status=result["status"],
         timestamp=datetime.now(),
         version="1.0.0",
-        uptime_seconds=3600
+        uptime_seconds=uptime_seconds()
     )
 
+@router.get(
+    "/health/live",
+    response_model=HealthResponse,
+    summary="Liveness probe",
+    description="The process is up and serving requests - no dependency checks"
+)
+def liveness():
+    """Liveness probe; restart the worker only if this fails"""
+    return HealthResponse(
+        status="alive",
+        timestamp=datetime.now(),
+        version="1.0.0",
+        uptime_seconds=uptime_seconds()
+    )
+
+@router.get(
+    "/health/ready",
+    response_model=ReadinessResponse,
+    responses={503: {"model": ReadinessResponse, "description": "Postgres unreachable"}},
+    summary="Readiness probe",
+    description="Probes Postgres and Redis concurrently; results cached for a short TTL"
+)
+async def readiness(response: Response):
+    """
+    Readiness probe for load balancers
+
+    Returns 503 when Postgres is unreachable. A Redis outage only degrades
+    the service, since the cache falls back to Postgres, and so does a
+    saturated connection pool (reported with its occupancy in the body).
+    """
+    result, cached = await health_checker.check()
+    if result["status"] == "unhealthy":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(**result, timestamp=datetime.now(), cached=cached)
+
 @router.get(
     "/metrics",
     response_model=MetricsResponse,
+    responses={503: {"model": ErrorResponse, "description": "Metrics not collected yet"}},
     summary="System metrics",
     description="Get current system performance metrics"
 )
-def get_metrics(current_user: dict = Depends(get_current_user)):
-    """System metrics with structured response"""
-    return MetricsResponse
\ No newline at end of file
+def get_metrics(current_user: User = Depends(get_current_user)):
+    """
+    System metrics with structured response
+
+    Served from the in-memory rollup refreshed every
+    metrics_refresh_seconds; see refreshed_at for its age. Pool
+    occupancy is read live.
+    """
+    snapshot = metrics_rollup.snapshot
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Metrics not collected yet",
+            headers={"Retry-After": "5"},
+        )
+    return MetricsResponse(
+        **snapshot,
+        db_pools=get_all_pool_stats(),
+        requested_by=current_user.username
+    )
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+import binascii
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional
-from datetime import datetime
+from sqlalchemy import select, update, func
+from typing import AsyncIterator, Optional
 from app.dependencies.auth import require_data_engineer, get_current_user
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, read_session, wants_primary
+from app.core.events import publish_event, pipeline_event
+from app.core.queries import PIPELINE_BY_ID, PIPELINE_COLUMNS, PIPELINE_ID_EXISTS
+from app.core.snapshot_cache import SnapshotCache, snapshot_response
+from app.core.serialization import (
+    ORJSONResponse, pipeline_row_to_dict, serialize_pipeline_list
+)
 from app.models.schemas import (
     Pipeline as PipelineSchema, PipelineListResponse, PipelineActionResponse,
-    ErrorResponse, PipelineStatus
+    PipelineBatchStartRequest, PipelineBatchStartResponse, PipelineStartResult,
+    ErrorResponse, PipelineStatus, ExportFormat
 )
 from app.models.db_models import Pipeline as PipelineModel, User
 
@@ -22,40 +35,220 @@ router = APIRouter(
     }
 )
 
+# Serialized list responses per filter combination, rebuilt after writes
+_list_snapshots = SnapshotCache(
+    "pipeline_list",
+    maxsize=settings.pipeline_snapshot_max_entries,
+    ttl_seconds=settings.pipeline_snapshot_ttl_seconds,
+    gzip_enabled=settings.pipeline_snapshot_gzip
+)
+
+
+def invalidate_pipeline_snapshots() -> None:
+    """Call after any write to pipelines so list reads are rebuilt"""
+    _list_snapshots.bump()
+
+
+def _encode_cursor(last_id: int) -> str:
+    """Encode the last seen pipeline id as an opaque cursor"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by _encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+        if not isinstance(last_id, int):
+            raise ValueError("cursor id must be an integer")
+        return last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def _pipeline_filters(tag: Optional[str], status_filter: Optional[PipelineStatus]) -> list:
+    """WHERE clauses shared by the list and export endpoints"""
+    filters = []
+    if status_filter:
+        filters.append(PipelineModel.status == status_filter)
+    if tag:
+        # tags @> ARRAY[tag], served by the GIN index on pipelines.tags
+        filters.append(PipelineModel.tags.contains([tag]))
+    return filters
+
+
 @router.get(
     "/",
     response_model=PipelineListResponse,
     status_code=status.HTTP_200_OK,
     summary="List all pipelines",
-    description="Retrieve all data pipelines with optional filtering"
+    description=(
+        "Retrieve data pipelines page by page (keyset on id) with optional filtering. "
+        "Supports conditional requests via ETag / If-None-Match."
+    )
 )
 async def list_pipelines_v2(
+    request: Request,
     tag: Optional[str] = None,
     status_filter: Optional[PipelineStatus] = None,
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_total: bool = Query(False, description="Also run a COUNT over the filtered set"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Enhanced pipeline list with filtering and structured response"""
-    query = select(PipelineModel)
+    """Enhanced pipeline list with keyset pagination, filtering and structured response"""
+    snapshot_key = (tag, status_filter, limit, after, include_total)
+    # Clients in their read-your-writes window skip snapshots built from replicas
+    snapshot = None if wants_primary(request) else _list_snapshots.get(snapshot_key)
+    if snapshot is not None:
+        # Served (or answered with 304) without touching Postgres
+        return snapshot_response(snapshot, request)
 
-    # Apply filters
-    if status_filter:
-        query = query.where(PipelineModel.status == status_filter)
+    version = _list_snapshots.version
+    filters = _pipeline_filters(tag, status_filter)
 
+    query = select(*PIPELINE_COLUMNS).where(*filters)
+    if after is not None:
+        query = query.where(PipelineModel.id > _decode_cursor(after))
+
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(PipelineModel.id).limit(limit + 1)
     result = await db.execute(query)
-    pipelines = result.scalars().all()
+    rows = result.all()
 
-    # Filter by tag (array operation)
-    if tag:
-        pipelines = [p for p in pipelines if p.tags and tag in p.tags]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].id)
 
-    # Convert to schema
-    pipeline_schemas = [PipelineSchema.model_validate(p) for p in pipelines]
+    total_count = None
+    if include_total:
+        count_query = select(func.count()).select_from(PipelineModel).where(*filters)
+        total_count = (await db.execute(count_query)).scalar_one()
 
-    return PipelineListResponse(
-        pipelines=pipeline_schemas,
-        total_count=len(pipeline_schemas),
-        filters_applied={"tag": tag, "status": status_filter}
+    # Rows straight to JSON bytes, no second validation by response_model
+    body = serialize_pipeline_list(
+        rows,
+        total_count=total_count,
+        next_cursor=next_cursor,
+        filters_applied={"tag": tag, "status": status_filter, "limit": limit, "after": after}
+    )
+
+    snapshot = _list_snapshots.put(snapshot_key, body, version)
+    return snapshot_response(snapshot, request)
+
+
+_EXPORT_COLUMNS = (
+    "id", "name", "status", "created_at", "updated_at", "last_run",
+    "success_rate", "records_processed", "tags"
+)
+
+
+def _export_values(pipeline: PipelineModel) -> tuple:
+    """Plain column values of a pipeline row for export"""
+    return (
+        pipeline.id,
+        pipeline.name,
+        pipeline.status.value if pipeline.status else None,
+        pipeline.created_at.isoformat() if pipeline.created_at else None,
+        pipeline.updated_at.isoformat() if pipeline.updated_at else None,
+        pipeline.last_run.isoformat() if pipeline.last_run else None,
+        pipeline.success_rate,
+        pipeline.records_processed,
+        pipeline.tags or [],
+    )
+
+
+def _encode_ndjson(rows: list) -> bytes:
+    lines = [
+        json.dumps(dict(zip(_EXPORT_COLUMNS, values)), separators=(",", ":"))
+        for values in rows
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _encode_csv(rows: list, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(_EXPORT_COLUMNS)
+    for values in rows:
+        # Tags are flattened into one "a|b|c" cell
+        writer.writerow(values[:-1] + ("|".join(values[-1]),))
+    return buffer.getvalue().encode()
+
+
+async def _stream_export(
+    filters: list, export_format: ExportFormat, prefer_primary: bool
+) -> AsyncIterator[bytes]:
+    """
+    Stream pipelines matching filters, encoded in chunks
+
+    Uses its own (replica) session: yield dependencies are finalized before
+    a streaming body is sent, so the request's session can't be used.
+    Rows come from a server-side cursor, so memory stays flat.
+    """
+    chunk_size = settings.export_chunk_size
+    query = (
+        select(PipelineModel)
+        .where(*filters)
+        .order_by(PipelineModel.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    async with read_session(prefer_primary=prefer_primary) as session:
+        result = await session.stream_scalars(query)
+        first_chunk = True
+        async for partition in result.partitions(chunk_size):
+            rows = [_export_values(p) for p in partition]
+            if export_format == ExportFormat.CSV:
+                yield _encode_csv(rows, header=first_chunk)
+            else:
+                yield _encode_ndjson(rows)
+            first_chunk = False
+            # Objects already sent are not needed in the identity map
+            session.expunge_all()
+
+        if first_chunk and export_format == ExportFormat.CSV:
+            yield _encode_csv([], header=True)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+            "description": "Pipelines streamed as NDJSON or CSV"
+        }
+    },
+    summary="Export pipelines",
+    description="Stream every pipeline matching the filters as NDJSON or CSV"
+)
+async def export_pipelines_v2(
+    request: Request,
+    tag: Optional[str] = None,
+    status_filter: Optional[PipelineStatus] = None,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="Output format"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the full pipeline inventory without materializing it"""
+    filters = _pipeline_filters(tag, status_filter)
+
+    if format == ExportFormat.CSV:
+        media_type, extension = "text/csv", "csv"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+
+    return StreamingResponse(
+        _stream_export(filters, format, wants_primary(request)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="pipelines.{extension}"'}
     )
 
 @router.get(
@@ -71,12 +264,11 @@ async def list_pipelines_v2(
 async def get_pipeline_v2(
     pipeline_id: int,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get detailed pipeline information"""
-    query = select(PipelineModel).where(PipelineModel.id == pipeline_id)
-    result = await db.execute(query)
-    pipeline = result.scalar_one_or_none()
+    result = await db.execute(PIPELINE_BY_ID, {"pipeline_id": pipeline_id})
+    pipeline = result.one_or_none()
 
     if not pipeline:
         raise HTTPException(
@@ -84,12 +276,88 @@ async def get_pipeline_v2(
             detail=f"Pipeline {pipeline_id} not found"
         )
 
-    return PipelineSchema.model_validate(pipeline)
+    if settings.fast_serialization:
+        return ORJSONResponse(pipeline_row_to_dict(pipeline))
+    return PipelineSchema.model_validate(pipeline, from_attributes=True)
+
+# A pipeline can be started from any status but running
+_STARTABLE = PipelineModel.status != PipelineStatus.RUNNING
+
+
+def _start_statement(*criteria):
+    """Guarded UPDATE moving matching pipelines to running, returning their ids"""
+    return (
+        update(PipelineModel)
+        .where(*criteria, _STARTABLE)
+        .values(status=PipelineStatus.RUNNING, last_run=func.now())
+        .returning(PipelineModel.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@router.post(
+    "/start",
+    response_model=PipelineBatchStartResponse,
+    summary="Start many pipelines",
+    description="Start a list of pipelines in one statement with a per-id outcome"
+)
+async def start_pipelines_batch_v2(
+    request: PipelineBatchStartRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start pipelines in bulk
+
+    All startable pipelines are moved to running by a single UPDATE.
+    Ids that are unknown or already running are reported as not started
+    without affecting the rest of the batch.
+    """
+    pipeline_ids = list(dict.fromkeys(request.pipeline_ids))
+
+    result = await db.execute(_start_statement(PipelineModel.id.in_(pipeline_ids)))
+    started = set(result.scalars().all())
+    await db.commit()
+
+    # Only the failures need a second look to tell missing from running
+    not_started = [pid for pid in pipeline_ids if pid not in started]
+    existing = set()
+    if not_started:
+        existing = set((await db.scalars(
+            select(PipelineModel.id).where(PipelineModel.id.in_(not_started))
+        )).all())
+
+    results = []
+    for pid in pipeline_ids:
+        if pid in started:
+            results.append(PipelineStartResult(pipeline_id=pid, started=True))
+        elif pid in existing:
+            results.append(PipelineStartResult(pipeline_id=pid, started=False, error="Already running"))
+        else:
+            results.append(PipelineStartResult(pipeline_id=pid, started=False, error="Not found"))
+
+    if started:
+        invalidate_pipeline_snapshots()
+        for pid in pipeline_ids:
+            if pid in started:
+                await publish_event(pipeline_event(pid, PipelineStatus.RUNNING.value))
+
+    return PipelineBatchStartResponse(
+        results=results,
+        started=len(started),
+        rejected=len(pipeline_ids) - len(started),
+        performed_by=current_user.username
+    )
+
 
 @router.post(
     "/{pipeline_id}/start",
     response_model=PipelineActionResponse,
     status_code=status.HTTP_200_OK,
+    responses={
+        404: {"model": ErrorResponse, "description": "Pipeline not found"},
+        409: {"model": ErrorResponse, "description": "Pipeline already running"}
+    },
     summary="Start pipeline",
     description="Start a specific pipeline with optional priority setting"
 )
@@ -100,25 +368,27 @@ async def start_pipeline_v2(
     db: AsyncSession = Depends(get_db)
 ):
     """Start pipeline with enhanced response"""
-    # Check if pipeline exists
-    query = select(PipelineModel).where(PipelineModel.id == pipeline_id)
-    result = await db.execute(query)
-    pipeline = result.scalar_one_or_none()
-
-    if not pipeline:
+    # One guarded UPDATE: concurrent starts can't both succeed
+    result = await db.execute(_start_statement(PipelineModel.id == pipeline_id))
+    if result.scalar_one_or_none() is None:
+        exists = await db.scalar(PIPELINE_ID_EXISTS, {"pipeline_id": pipeline_id})
+        if exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Pipeline {pipeline_id} not found"
+            )
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Pipeline {pipeline_id} not found"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Pipeline {pipeline_id} is already running"
         )
 
-    # Update pipeline status
-    pipeline.status = PipelineStatus.RUNNING
-    pipeline.last_run = datetime.now()
     await db.commit()
+    invalidate_pipeline_snapshots()
+    await publish_event(pipeline_event(pipeline_id, PipelineStatus.RUNNING.value))
 
     return PipelineActionResponse(
         message=f"Pipeline {pipeline_id} started with {priority} priority",
         pipeline_id=pipeline_id,
         status=PipelineStatus.RUNNING,
         performed_by=current_user.username
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+In-process endpoint benchmark
+
+Drives the real app.main:app through httpx's ASGI transport (no network,
+no uvicorn) with the full lifespan running against:
+
+- SQLite in a temporary file (Postgres-only column types mapped to JSON),
+  or any database given with --database-url, e.g. a local Postgres
+- an in-memory fake Redis (fakeredis) for the cache and status events
+
+Each endpoint gets --rounds rounds of --requests requests from
+--concurrency concurrent clients after a short warm-up. Throughput and
+p50/p95/p99 latency are reported per endpoint, each the best of its rounds
+to damp scheduler and SQLite lock noise. On SQLite, write endpoints
+(pipelines_start, jobs_create) queue on the single-writer file lock, so
+their tail latencies say more about SQLite than the app and only their
+p50 and throughput are gated there; use a local Postgres via
+--database-url to gate their p95 too.
+
+With --baseline, results are compared against a stored run and the script
+exits with status 1 when any endpoint's p50/p95 grows, or its throughput
+drops, by more than --threshold. Record the baseline on the machine that
+runs the comparison:
+
+    python scripts/bench_endpoints.py --save-baseline scripts/bench_baseline.json
+    python scripts/bench_endpoints.py --baseline scripts/bench_baseline.json
+
+Requires the dev-only packages httpx, aiosqlite and fakeredis.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+USERNAME = "bench_engineer"
+PASSWORD = "bench-password"
+# Their p95 waits on SQLite's file lock, so only p50/throughput gate them there
+WRITE_ENDPOINTS = ("pipelines_start", "jobs_create")
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: Callable[[int], str]
+    expected: tuple[int, ...] = (200,)
+    auth: bool = True
+    data: Optional[dict] = None
+    json_body: Optional[Callable[[int], dict]] = None
+    # Fraction of --requests/--warmup sent (bcrypt-bound login is ~100x slower)
+    share: float = 1.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint")
+    parser.add_argument("--rounds", type=int, default=3, help="Measured rounds per endpoint; best is kept")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent in-flight requests")
+    parser.add_argument("--pipelines", type=int, default=500, help="Pipelines to seed")
+    parser.add_argument("--endpoints", help="Comma-separated subset of endpoints to run")
+    parser.add_argument("--database-url", help="Async database URL (default: temporary SQLite file)")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON file")
+    parser.add_argument("--save-baseline", help="Write the results to this baseline JSON file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25,
+        help="Allowed regression as a fraction of the baseline (default 0.25 = 25%%)"
+    )
+    return parser.parse_args()
+
+
+def configure_environment(database_url: str) -> None:
+    """Point the settings at the benchmark backends; must run before importing app"""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["DATABASE_REPLICA_URLS"] = ""
+    os.environ["REDIS_URL"] = "redis://bench-fake-redis:6379/0"
+    os.environ.pop("METRICS_MULTIPROC_DIR", None)
+    # Throwaway database: build tables from the models instead of migrations
+    os.environ.setdefault("DB_SCHEMA_MODE", "create_all")
+    # Jobs finish in milliseconds here; don't let a backlog turn POSTs into 503s
+    os.environ.setdefault("JOB_QUEUE_SIZE", "100000")
+    # Only problems, not every job recovery or cache event
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def install_fake_redis() -> None:
+    """Back the app's Redis pool with one in-memory fakeredis server"""
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeConnection
+    from app.core import cache
+
+    server = FakeServer()
+
+    class FakeRedisPool(cache.BlockingConnectionPool):
+        @classmethod
+        def from_url(cls, url: str, **kwargs):
+            for option in ("socket_connect_timeout", "socket_timeout"):
+                kwargs.pop(option, None)
+            return cls(connection_class=FakeConnection, server=server, **kwargs)
+
+    cache.BlockingConnectionPool = FakeRedisPool
+
+
+def prepare_sqlite(path: str) -> None:
+    """
+    SQLite has no ARRAY type: store pipeline tags as JSON instead. WAL lets
+    readers proceed while the job runner and the requests take turns writing.
+    """
+    import sqlite3
+    from sqlalchemy import JSON
+    from app.models.db_models import Pipeline
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+    Pipeline.__table__.c.tags.type = JSON()
+
+
+async def seed(pipelines: int) -> None:
+    from sqlalchemy import delete, select
+    from app.core.database import AsyncSessionLocal
+    from app.core.security import get_password_hash
+    from app.models.db_models import Job, Pipeline, User
+    from app.models.schemas import PipelineStatus
+
+    async with AsyncSessionLocal() as session:
+        for model in (Job, Pipeline, User):
+            await session.execute(delete(model))
+        session.add(User(
+            username=USERNAME, email=f"{USERNAME}@example.com",
+            hashed_password=get_password_hash(PASSWORD), role="data_engineer"
+        ))
+        session.add_all([
+            Pipeline(
+                name=f"bench_pipeline_{i}", status=PipelineStatus.STOPPED,
+                success_rate=97.5, records_processed=1000 * i, tags=["bench", "daily"]
+            )
+            for i in range(pipelines)
+        ])
+        await session.flush()
+        session.add(Job(pipeline_id=await session.scalar(select(Pipeline.id).limit(1)), status="completed"))
+        await session.commit()
+
+
+async def reset_pipelines() -> None:
+    """Make every pipeline startable again"""
+    from sqlalchemy import update
+    from app.core.database import AsyncSessionLocal
+    from app.models.db_models import Pipeline
+    from app.models.schemas import PipelineStatus
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Pipeline).values(status=PipelineStatus.STOPPED))
+        await session.commit()
+
+
+async def wait_for_job_runner(timeout: float = 60.0) -> None:
+    """Let accepted jobs finish so their writes don't skew the next endpoint"""
+    from app.core.job_runner import job_runner
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = job_runner.stats()
+        if not (stats["queued"] or stats["parked"] or stats["running"]):
+            return
+        await asyncio.sleep(0.05)
+
+
+def build_endpoints(pipeline_ids: list[int], job_id: int) -> list[Endpoint]:
+    def pipeline_id(i: int) -> int:
+        return pipeline_ids[i % len(pipeline_ids)]
+
+    return [
+        Endpoint(
+            "login", "POST", lambda i: "/api/v1/auth/login", auth=False,
+            data={"username": USERNAME, "password": PASSWORD}, share=0.1
+        ),
+        Endpoint("auth_me", "GET", lambda i: "/api/v1/auth/me"),
+        Endpoint("pipelines_list", "GET", lambda i: "/api/v2/pipelines/?limit=50"),
+        Endpoint("pipelines_get", "GET", lambda i: f"/api/v2/pipelines/{pipeline_id(i)}"),
+        # 409 once every pipeline has been started in this run
+        Endpoint(
+            "pipelines_start", "POST", lambda i: f"/api/v2/pipelines/{pipeline_id(i)}/start",
+            expected=(200, 409)
+        ),
+        Endpoint(
+            "jobs_create", "POST", lambda i: "/api/v1/jobs/", expected=(202,),
+            json_body=lambda i: {"pipeline_id": pipeline_id(i)}
+        ),
+        Endpoint("jobs_list", "GET", lambda i: "/api/v1/jobs/?limit=50"),
+        Endpoint("jobs_get", "GET", lambda i: f"/api/v1/jobs/{job_id}"),
+    ]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+async def run_endpoint(client, endpoint: Endpoint, headers: dict, total: int, concurrency: int):
+    latencies: list[float] = []
+    errors: dict[int, int] = {}
+    next_index = 0
+
+    async def send(i: int) -> None:
+        start = time.perf_counter()
+        response = await client.request(
+            endpoint.method, endpoint.path(i),
+            headers=headers if endpoint.auth else None,
+            data=endpoint.data,
+            json=endpoint.json_body(i) if endpoint.json_body else None
+        )
+        latencies.append(time.perf_counter() - start)
+        if response.status_code not in endpoint.expected:
+            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < total:
+            i = next_index
+            next_index += 1
+            await send(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, total))])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def best_of(rounds: list[dict]) -> dict:
+    """Best value of each metric across rounds; errors are summed"""
+    errors: dict[int, int] = {}
+    for r in rounds:
+        for code, n in r["errors"].items():
+            errors[code] = errors.get(code, 0) + n
+    return {
+        "requests": rounds[0]["requests"],
+        "errors": errors,
+        "rps": max(r["rps"] for r in rounds),
+        **{metric: min(r[metric] for r in rounds) for metric in ("p50_ms", "p95_ms", "p99_ms")}
+    }
+
+
+def print_results(results: dict) -> None:
+    print(f"\n{'endpoint':<16} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  errors")
+    for name, r in results.items():
+        errors = ", ".join(f"{code}x{n}" for code, n in r["errors"].items()) or "-"
+        print(
+            f"{name:<16} {r['rps']:9.1f} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f}  {errors}"
+        )
+
+
+def compare(results: dict, baseline: dict, threshold: float, sqlite: bool) -> list[str]:
+    """Regressions beyond threshold, one line each"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get("endpoints", {}).get(name)
+        if base is None:
+            continue
+        tail_gated = not (sqlite and name in WRITE_ENDPOINTS)
+        for metric in ("p50_ms", "p95_ms") if tail_gated else ("p50_ms",):
+            if base[metric] and r[metric] > base[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {r[metric]:.2f} vs baseline {base[metric]:.2f} "
+                    f"(+{(r[metric] / base[metric] - 1) * 100:.0f}%)"
+                )
+        if base["rps"] and r["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: throughput {r['rps']:.1f} req/s vs baseline {base['rps']:.1f} "
+                f"(-{(1 - r['rps'] / base['rps']) * 100:.0f}%)"
+            )
+    return regressions
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    import httpx
+    from sqlalchemy import select
+    from app.core.database import AsyncSessionLocal
+    from app.main import app
+    from app.models.db_models import Job, Pipeline
+
+    async with app.router.lifespan_context(app):
+        await seed(args.pipelines)
+        async with AsyncSessionLocal() as session:
+            pipeline_ids = list((await session.scalars(select(Pipeline.id).order_by(Pipeline.id))).all())
+            job_id = await session.scalar(select(Job.id).limit(1))
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post(
+                "/api/v1/auth/login", data={"username": USERNAME, "password": PASSWORD}
+            )
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            endpoints = build_endpoints(pipeline_ids, job_id)
+            if args.endpoints:
+                wanted = set(args.endpoints.split(","))
+                endpoints = [e for e in endpoints if e.name in wanted]
+
+            results = {}
+            for endpoint in endpoints:
+                if endpoint.name == "pipelines_start":
+                    await reset_pipelines()
+                warmup = max(int(args.warmup * endpoint.share), 1)
+                await run_endpoint(client, endpoint, headers, warmup, args.concurrency)
+                await wait_for_job_runner()
+                rounds = []
+                for _ in range(args.rounds):
+                    if endpoint.name == "pipelines_start":
+                        await reset_pipelines()
+                    rounds.append(await run_endpoint(
+                        client, endpoint, headers, max(int(args.requests * endpoint.share), 1), args.concurrency
+                    ))
+                    await wait_for_job_runner()
+                results[endpoint.name] = best_of(rounds)
+                print(f"  {endpoint.name}: done", file=sys.stderr)
+    return results
+
+
+def main() -> int:
+    from sqlalchemy.engine import make_url
+
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix="bench-endpoints-") as tmp:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{tmp}/bench.db"
+        configure_environment(database_url)
+        install_fake_redis()
+        url = make_url(database_url)
+        if url.get_backend_name() == "sqlite" and url.database:
+            prepare_sqlite(url.database)
+        results = asyncio.run(benchmark(args))
+
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "rounds": args.rounds,
+                "endpoints": results
+            }, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    failed = [name for name, r in results.items() if r["errors"]]
+    if failed:
+        print(f"\nUnexpected status codes from: {', '.join(failed)}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        recorded = (baseline.get("requests"), baseline.get("concurrency"), baseline.get("rounds"))
+        if recorded != (args.requests, args.concurrency, args.rounds):
+            print("\nWarning: baseline was recorded with different --requests/--concurrency/--rounds")
+        regressions = compare(results, baseline, args.threshold, sqlite=url.get_backend_name() == "sqlite")
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} of the baseline")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
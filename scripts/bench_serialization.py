@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compare pipeline list serialization paths at 1k/10k/100k rows"""
+
+import asyncio
+import sys
+import os
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.core.config import settings
+from app.core.serialization import PIPELINE_FIELDS, serialize_pipeline_list
+from app.models.db_models import Pipeline as PipelineModel
+from app.models.schemas import Pipeline as PipelineSchema, PipelineListResponse, PipelineStatus
+
+Row = namedtuple("Row", PIPELINE_FIELDS)
+FILTERS = {"tag": None, "status": None, "limit": None, "after": None}
+
+
+def make_rows(n: int) -> tuple[list, list]:
+    """Build n ORM objects and the equivalent Core-style rows"""
+    now = datetime.now(timezone.utc)
+    orm_rows, core_rows = [], []
+    for i in range(n):
+        values = dict(
+            name=f"pipeline_{i}",
+            status=PipelineStatus.RUNNING,
+            tags=["daily", "etl"],
+            id=i + 1,
+            created_at=now - timedelta(days=30),
+            last_run=now,
+            success_rate=98.5,
+            records_processed=150000 + i,
+        )
+        orm_rows.append(PipelineModel(**values))
+        core_rows.append(Row(**values))
+    return orm_rows, core_rows
+
+
+async def current_path(orm_rows: list) -> bytes:
+    """model_validate per row, then FastAPI validates response_model again"""
+    response = PipelineListResponse(
+        pipelines=[PipelineSchema.model_validate(p, from_attributes=True) for p in orm_rows],
+        total_count=len(orm_rows),
+        filters_applied=FILTERS
+    )
+    field = create_model_field(name="response", type_=PipelineListResponse, mode="serialization")
+    content = await serialize_response(field=field, response_content=response)
+    return JSONResponse(content).body
+
+
+async def timed(label: str, n: int, fn, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{n:>7} rows  {label:<22} {best * 1000:9.1f} ms  ({len(body) / 1024:,.0f} KiB)")
+
+
+async def main():
+    for n in (1_000, 10_000, 100_000):
+        orm_rows, core_rows = make_rows(n)
+        repeat = 5 if n < 100_000 else 2
+
+        await timed("current (double)", n, lambda: current_path(orm_rows), repeat)
+
+        settings.fast_serialization = False
+
+        async def adapter():
+            return serialize_pipeline_list(core_rows, n, None, FILTERS)
+        await timed("TypeAdapter (once)", n, adapter, repeat)
+
+        settings.fast_serialization = True
+
+        async def fast():
+            return serialize_pipeline_list(core_rows, n, None, FILTERS)
+        await timed("orjson (no validation)", n, fast, repeat)
+        print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Check read-your-writes routing end to end
+
+Runs the app in-process with a primary and one read replica (two SQLite
+files seeded identically, so the replica is "lagging" by everything
+written afterwards) and asserts that:
+
+1. POST /api/v2/pipelines/{id}/start returns X-Read-Primary-Until and the
+   read_primary_until cookie
+2. A client without the cookie still reads from the replica
+3. A list by the writer, sending the cookie, reads from the primary and
+   sees the pipeline running (skipping the snapshot the replica read built)
+
+Exits with status 1 if any check failed.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from bench_endpoints import configure_environment, install_fake_redis, prepare_sqlite
+
+USERNAME = "ryw_engineer"
+PASSWORD = "ryw-password"
+
+
+def seed(path: str) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.core.database import Base
+    from app.core.security import get_password_hash
+    from app.models.db_models import Pipeline, User
+    from app.models.schemas import PipelineStatus
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(
+            username=USERNAME, email=f"{USERNAME}@example.com",
+            hashed_password=get_password_hash(PASSWORD), role="data_engineer"
+        ))
+        session.add(Pipeline(name="ryw_pipeline", status=PipelineStatus.STOPPED, tags=["ryw"]))
+        session.commit()
+    engine.dispose()
+
+
+failures: list[str] = []
+
+
+def check(condition: bool, message: str) -> None:
+    print(f"{'ok  ' if condition else 'FAIL'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+async def run_checks() -> None:
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://ryw") as writer, \
+                httpx.AsyncClient(transport=transport, base_url="http://ryw") as other:
+            login = await writer.post("/api/v1/auth/login", data={"username": USERNAME, "password": PASSWORD})
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+            started = await writer.post("/api/v2/pipelines/1/start", headers=headers)
+            check(started.status_code == 200, f"start returned {started.status_code}")
+            check("x-read-primary-until" in started.headers, "start sets X-Read-Primary-Until")
+            check("read_primary_until" in writer.cookies, "start sets the read_primary_until cookie")
+
+            listed = await other.get("/api/v2/pipelines/", headers=headers)
+            status = listed.json()["pipelines"][0]["status"]
+            check(status == "stopped", f"other client's list reads the replica (status {status})")
+
+            listed = await writer.get("/api/v2/pipelines/", headers=headers)
+            status = listed.json()["pipelines"][0]["status"]
+            check(status == "running", f"writer's list reads the primary (status {status})")
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory(prefix="check-ryw-") as tmp:
+        primary, replica = f"{tmp}/primary.db", f"{tmp}/replica.db"
+        configure_environment(f"sqlite+aiosqlite:///{primary}")
+        os.environ["DATABASE_REPLICA_URLS"] = f"sqlite+aiosqlite:///{replica}"
+        os.environ["READ_YOUR_WRITES_SECONDS"] = "5"
+        install_fake_redis()
+        for path in (primary, replica):
+            prepare_sqlite(path)
+            seed(path)
+        asyncio.run(run_checks())
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()